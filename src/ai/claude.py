@@ -5,12 +5,159 @@
 - openai_responses: OpenAI 兼容的 /v1/responses（部分代理仅支持该接口）
 """
 
+import re
 import time
+import atexit
 import json
-from typing import Optional, Dict, Any
+import threading
+from typing import Optional, Dict, Any, List, Iterator
 
 import requests
-from anthropic import Anthropic, APIError, RateLimitError
+from anthropic import Anthropic, APIError, RateLimitError, DefaultHttpxClient, Timeout
+
+try:
+    import h2  # noqa: F401  httpx 的 HTTP/2 支持依赖 h2
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+
+# Markdown 代码块围栏
+_FENCE_OPEN_RE = re.compile(r'^```\w*\n?')
+_FENCE_CLOSE_RE = re.compile(r'\n?```\s*$')
+
+# Message Batch 最长等待时间（秒），与 API 的 24h 过期时间一致
+BATCH_TIMEOUT = 24 * 3600
+
+
+class TruncatedResponseError(Exception):
+    """响应因达到 max_tokens 被截断（仅在调用方要求 allow_truncated=False 时抛出）"""
+    pass
+
+
+# 进程内共享的连接池：所有 ClaudeClient 复用，避免每个实例/请求重新握手
+_http_client = None
+_http_session = None
+_http_lock = threading.Lock()
+
+
+def _shared_http_client() -> DefaultHttpxClient:
+    """Anthropic SDK 使用的共享 httpx 客户端（有 h2 时启用 HTTP/2，连接数沿用 SDK 默认上限）"""
+    global _http_client
+    with _http_lock:
+        if _http_client is None or _http_client.is_closed:
+            _http_client = DefaultHttpxClient(
+                http2=_HTTP2,
+                timeout=Timeout(60.0, connect=5.0),
+            )
+        return _http_client
+
+
+def _shared_http_session() -> requests.Session:
+    """openai_responses 协议使用的共享 requests Session（keep-alive）"""
+    global _http_session
+    with _http_lock:
+        if _http_session is None:
+            _http_session = requests.Session()
+        return _http_session
+
+
+def close_shared_http_clients():
+    """关闭共享连接池（进程退出前调用；之后新建的 ClaudeClient 会重新创建）"""
+    global _http_client, _http_session
+    with _http_lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
+
+
+# 共享连接池只在进程退出时关闭，其间任何 ClaudeClient 都可能还在使用
+atexit.register(close_shared_http_clients)
+
+
+class _JSONArraySplitter:
+    """
+    增量切分流式文本中的 JSON 数组元素
+
+    只处理顶层数组：跳过开头的空白和 ```json 围栏行后，第一个字符必须是 '['，
+    之后跟踪括号深度和字符串状态，每当一个对象/数组元素闭合就 json.loads 并返回。
+    顶层不是数组（如 {"tags": [...], "items": [...]}、前面有说明文字）时不切分，
+    由调用方对 text 整段解析。
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._element = []
+        self._depth = 0
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._escape = False
+        # 开头的 ``` 个数；凑满 3 个后跳过围栏行的剩余部分（如 "json"）
+        self._fence_ticks = 0
+        self._in_fence = False
+
+    @property
+    def text(self) -> str:
+        """目前收到的完整文本"""
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> List[Any]:
+        self._chunks.append(chunk)
+        completed = []
+        for ch in chunk:
+            if self._done:
+                break
+            if not self._started:
+                if self._in_fence:
+                    if ch == "\n":
+                        self._in_fence = False
+                elif ch == "`" and self._fence_ticks < 3:
+                    self._fence_ticks += 1
+                    self._in_fence = self._fence_ticks == 3
+                elif ch.isspace() and self._fence_ticks in (0, 3):
+                    pass
+                elif ch == "[" and self._fence_ticks in (0, 3):
+                    self._started = True
+                    self._depth = 1
+                else:
+                    # 顶层不是数组：不再切分
+                    self._done = True
+                continue
+
+            if self._depth == 1:
+                # 元素之间：只关心新元素开始和数组结束
+                if ch == "]":
+                    self._done = True
+                elif ch in "{[":
+                    self._element = [ch]
+                    self._depth = 2
+                continue
+
+            self._element.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    try:
+                        completed.append(json.loads("".join(self._element)))
+                    except json.JSONDecodeError:
+                        pass
+                    self._element = []
+        return completed
 
 
 class ClaudeClient:
@@ -45,10 +192,11 @@ class ClaudeClient:
         self.base_url = base_url
 
         if self.protocol == "anthropic":
+            http_client = _shared_http_client()
             if base_url:
-                self.client = Anthropic(api_key=api_key, base_url=base_url)
+                self.client = Anthropic(api_key=api_key, base_url=base_url, http_client=http_client)
             else:
-                self.client = Anthropic(api_key=api_key)
+                self.client = Anthropic(api_key=api_key, http_client=http_client)
         elif self.protocol == "openai_responses":
             # OpenAI Responses 兼容端点（base_url 建议形如 http://host:port/v1）
             if not base_url:
@@ -57,6 +205,30 @@ class ClaudeClient:
         else:
             raise ValueError(f"Unsupported protocol: {self.protocol}")
 
+        # prompt cache 命中统计（多线程共享）
+        self.cache_stats = {
+            "input_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "cache_creation_input_tokens": 0,
+        }
+        self._stats_lock = threading.Lock()
+
+    def close(self):
+        """释放本实例（共享连接池由其他实例继续复用，进程退出时经 atexit 关闭）"""
+        self.client = None
+
+    @staticmethod
+    def cache_blocks(text: str) -> List[Dict[str, Any]]:
+        """把静态 system 指令包装成可被 Anthropic prompt cache 命中的 block"""
+        return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+    def _record_usage(self, usage):
+        if usage is None:
+            return
+        with self._stats_lock:
+            for key in self.cache_stats:
+                self.cache_stats[key] += getattr(usage, key, 0) or 0
+
     def _call_openai_responses(
         self,
         prompt: str,
@@ -64,6 +236,8 @@ class ClaudeClient:
         max_tokens: int,
         temperature: float,
         timeout: int,
+        model: Optional[str] = None,
+        allow_truncated: bool = True,
     ) -> str:
         url = self.base_url.rstrip("/") + "/responses"
 
@@ -83,14 +257,14 @@ class ClaudeClient:
         )
 
         payload = {
-            "model": self.model,
+            "model": model or self.model,
             "input": messages,
             "max_output_tokens": max_tokens,
             "temperature": temperature,
             "stream": False,
         }
 
-        resp = requests.post(
+        resp = _shared_http_session().post(
             url,
             headers={
                 "Authorization": f"Bearer {self.api_key}",
@@ -109,6 +283,8 @@ class ClaudeClient:
             raise RuntimeError(f"OpenAI responses error {resp.status_code}: {err}")
 
         data = resp.json()
+        if not allow_truncated and data.get("status") == "incomplete":
+            raise TruncatedResponseError(f"响应未完成: {data.get('incomplete_details')}")
 
         # OpenAI Responses: output -> message -> content -> output_text
         try:
@@ -136,37 +312,63 @@ class ClaudeClient:
         temperature: float = 0.2,
         timeout: int = 120,
         max_retries: int = 3,
+        system_blocks: Optional[List[Dict[str, Any]]] = None,
+        model_override: Optional[str] = None,
+        retry_rate_limit: bool = True,
+        allow_truncated: bool = True,
     ) -> str:
-        """调用模型（带重试和超时处理）"""
+        """
+        调用模型（带重试和超时处理）
+
+        system_blocks: 可选的结构化 system（见 cache_blocks），优先于 system
+        model_override: 本次调用使用的模型（如 pass1 用 Haiku），默认 self.model
+        retry_rate_limit: False 时 429 直接抛出 RateLimitError（调用方自行退避），
+            其他 API 错误照常重试
+        allow_truncated: False 时响应达到 max_tokens 被截断即抛出 TruncatedResponseError（不重试）
+        """
         for attempt in range(max_retries):
             try:
                 if self.protocol == "anthropic":
                     response = self.client.messages.create(
-                        model=self.model,
+                        model=model_override or self.model,
                         max_tokens=max_tokens,
                         temperature=temperature,
-                        system=system if system else None,
+                        system=system_blocks or system or None,
                         messages=[{"role": "user", "content": prompt}],
                         timeout=timeout,
                     )
+                    self._record_usage(getattr(response, "usage", None))
+                    if not allow_truncated and getattr(response, "stop_reason", None) == "max_tokens":
+                        raise TruncatedResponseError(f"响应达到 max_tokens={max_tokens} 被截断")
 
                     if response.content and len(response.content) > 0:
                         return response.content[0].text
                     return ""
 
                 if self.protocol == "openai_responses":
+                    if system_blocks:
+                        system = "\n\n".join(b["text"] for b in system_blocks)
                     return self._call_openai_responses(
                         prompt=prompt,
                         system=system,
                         max_tokens=max_tokens,
                         temperature=temperature,
                         timeout=timeout,
+                        model=model_override,
+                        allow_truncated=allow_truncated,
                     )
 
                 raise ValueError(f"Unsupported protocol: {self.protocol}")
 
+            except TruncatedResponseError:
+                # 同样的 max_tokens 重试仍会截断
+                raise
+
             except RateLimitError:
-                wait_time = 5 * (attempt + 1)
+                # 429: 指数退避；重试耗尽时抛出，交给调用方决定是否继续退避
+                if not retry_rate_limit or attempt == max_retries - 1:
+                    raise
+                wait_time = 5 * (2 ** attempt)
                 print(f"   ⏳ Rate limit 触发，等待 {wait_time}s...")
                 time.sleep(wait_time)
 
@@ -198,18 +400,170 @@ class ClaudeClient:
     ) -> Dict[Any, Any]:
         """调用模型并解析 JSON 响应（多策略提取）"""
         response = self.call(prompt, system, max_tokens, timeout=timeout, max_retries=max_retries, **kwargs)
+        return self._parse_json_response(response)
+
+    def stream_call_with_json(
+        self,
+        prompt: str,
+        system: str = "",
+        max_tokens: int = 8192,
+        temperature: float = 0.2,
+        timeout: int = 120,
+        system_blocks: Optional[List[Dict[str, Any]]] = None,
+        model_override: Optional[str] = None,
+    ) -> Iterator[Any]:
+        """
+        流式调用模型，逐个 yield 响应中 JSON 数组的元素
 
+        兼容 [...] 与 {"items": [...]} 两种形式。流式没有切出任何元素时
+        （格式异常、openai_responses 协议、流在首个元素前失败），
+        回退到 call_with_json 的整段解析。
+        """
+        if self.protocol == "anthropic":
+            request = {
+                "model": model_override or self.model,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "messages": [{"role": "user", "content": prompt}],
+                "timeout": timeout,
+            }
+            if system_blocks or system:
+                request["system"] = system_blocks or system
+
+            splitter = _JSONArraySplitter()
+            yielded = 0
+            try:
+                with self.client.messages.stream(**request) as stream:
+                    for text in stream.text_stream:
+                        for element in splitter.feed(text):
+                            yielded += 1
+                            yield element
+                    self._record_usage(getattr(stream.get_final_message(), "usage", None))
+            except Exception as e:
+                if yielded:
+                    raise
+                print(f"   ⚠️ 流式请求失败，回退到普通请求: {e}")
+            else:
+                if yielded:
+                    return
+                result = self._parse_json_response(splitter.text)
+                yield from self.json_elements(result)
+                return
+
+        result = self.call_with_json(
+            prompt,
+            system,
+            max_tokens,
+            timeout=timeout,
+            temperature=temperature,
+            system_blocks=system_blocks,
+            model_override=model_override,
+        )
+        yield from self.json_elements(result)
+
+    def batch_request(
+        self,
+        custom_id: str,
+        prompt: str,
+        system: str = "",
+        max_tokens: int = 4096,
+        temperature: float = 0.2,
+        system_blocks: Optional[List[Dict[str, Any]]] = None,
+        model_override: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """构造一条 Message Batches 请求（参数与 call 一致）"""
+        params = {
+            "model": model_override or self.model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+        if system_blocks or system:
+            params["system"] = system_blocks or system
+        return {"custom_id": custom_id, "params": params}
+
+    def batch_call(
+        self,
+        requests: List[Dict[str, Any]],
+        poll_interval: int = 30,
+        timeout: int = BATCH_TIMEOUT,
+        allow_truncated: bool = True,
+    ) -> Dict[str, Optional[str]]:
+        """
+        通过 Message Batches API 一次提交多条请求并轮询至完成（约半价，服务端并行）
+
+        Args:
+            requests: batch_request 构造的请求列表（custom_id 需唯一，仅限 [a-zA-Z0-9_-]）
+            poll_interval: 轮询间隔（秒）
+            timeout: 最长等待时间（秒），超时会取消 batch 并抛出 TimeoutError；
+                轮询被其他异常打断（全局超时、Ctrl-C）时同样取消 batch 再抛出
+            allow_truncated: False 时达到 max_tokens 被截断的响应按失败处理（值为 None）
+
+        Returns:
+            Dict[custom_id, 文本]；单条请求失败 / 过期时对应值为 None
+        """
+        if self.protocol != "anthropic":
+            raise ValueError(f"Message Batches API 不支持 {self.protocol} 协议")
+
+        batch = self.client.messages.batches.create(requests=requests)
+        print(f"   📮 已提交 Message Batch {batch.id}: {len(requests)} 个请求")
+
+        deadline = time.monotonic() + timeout
+        try:
+            while batch.processing_status != "ended":
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Message Batch {batch.id} 超时未完成")
+                time.sleep(poll_interval)
+                batch = self.client.messages.batches.retrieve(batch.id)
+        finally:
+            if batch.processing_status != "ended":
+                # 不再等待结果的 batch 立即取消，避免调用方回退到逐次调用后重复计费
+                try:
+                    self.client.messages.batches.cancel(batch.id)
+                    print(f"   🛑 已取消 Message Batch {batch.id}")
+                except Exception as e:
+                    print(f"   ⚠️ 取消 Message Batch {batch.id} 失败: {e}")
+
+        texts = {}
+        for entry in self.client.messages.batches.results(batch.id):
+            if entry.result.type != "succeeded":
+                texts[entry.custom_id] = None
+                continue
+            message = entry.result.message
+            self._record_usage(getattr(message, "usage", None))
+            if not allow_truncated and getattr(message, "stop_reason", None) == "max_tokens":
+                texts[entry.custom_id] = None
+                continue
+            texts[entry.custom_id] = message.content[0].text if message.content else ""
+
+        failed = sum(1 for text in texts.values() if text is None)
+        print(f"   📬 Message Batch 完成: {len(texts) - failed}/{len(requests)} 成功")
+        return texts
+
+    def parse_json(self, response: str) -> Dict[Any, Any]:
+        """解析模型输出的 JSON（供 batch_call 的结果使用）"""
+        return self._parse_json_response(response)
+
+    @staticmethod
+    def json_elements(result) -> List[Any]:
+        """取出 JSON 响应中的数组元素（兼容 [...] 与 {"items": [...]}）"""
+        if isinstance(result, list):
+            return result
+        if isinstance(result, dict) and isinstance(result.get("items"), list):
+            return result["items"]
+        return []
+
+    def _parse_json_response(self, response: str) -> Dict[Any, Any]:
+        """从模型输出中解析 JSON（多策略：直接解析 / 去代码块 / 括号匹配 / 截断修复）"""
         try:
             return json.loads(response)
         except json.JSONDecodeError:
             pass
 
-        import re
-
         cleaned = response.strip()
         if cleaned.startswith("```"):
-            cleaned = re.sub(r'^```\w*\n?', '', cleaned)
-            cleaned = re.sub(r'\n?```\s*$', '', cleaned)
+            cleaned = _FENCE_OPEN_RE.sub('', cleaned)
+            cleaned = _FENCE_CLOSE_RE.sub('', cleaned)
             cleaned = cleaned.strip()
             try:
                 return json.loads(cleaned)
@@ -261,14 +615,17 @@ class ClaudeClient:
     def estimate_tokens(self, text: str) -> int:
         return len(text) // 3
 
+    def estimate_item_tokens(self, item) -> int:
+        """等价于 estimate_tokens(f"{title} {text}")，但不拼接字符串"""
+        return (len(item.title) + 1 + len(item.text)) // 3
+
     def batch_items_by_tokens(self, items: list, max_tokens: int = 100000) -> list:
         batches = []
         current_batch = []
         current_tokens = 0
 
         for item in items:
-            item_text = f"{item.title} {item.text}"
-            item_tokens = self.estimate_tokens(item_text)
+            item_tokens = self.estimate_item_tokens(item)
 
             if current_tokens + item_tokens > max_tokens and current_batch:
                 batches.append(current_batch)
@@ -1,5 +1,11 @@
 """Prompt 模板库 - v0.2.0 增强版"""
 
+from functools import lru_cache
+
+
+# prompt 模板版本：修改 extract prompt 时递增，使 brief 缓存失效
+PROMPT_VERSION = 1
+
 
 # 老板 Profile Context（注入到所有 prompt 中）
 OWNER_PROFILE = """你的读者是一位 AI 算法工程师 + Crypto 量化研究者，他关注：
@@ -10,6 +16,20 @@ OWNER_PROFILE = """你的读者是一位 AI 算法工程师 + Crypto 量化研
 - 科技商业：融资动态、产品创新、科技公司战略"""
 
 
+# 单条 item 的渲染模板（不含 ID 行，ID 随批次变化）
+_FILTER_ITEM_ZH = "标题: {title}\n来源: {source} | 作者: {author}\n内容: {text}"
+_FILTER_ITEM_EN = "Title: {title}\nSource: {source} | Author: {author}\nContent: {text}"
+_EXTRACT_ITEM_ZH = "标题: {title}\n来源: {source} | 作者: {author}\n链接: {url}\n内容: {text}"
+_EXTRACT_ITEM_EN = "Title: {title}\nSource: {source} | Author: {author}\nURL: {url}\nContent: {text}"
+
+
+@lru_cache(maxsize=20000)
+def _render_item_block(template: str, title: str, source: str, author: str,
+                       url: str, text: str) -> str:
+    """按内容缓存单条 item 的渲染结果（pass1 → pass2、重跑之间复用）"""
+    return template.format(title=title, source=source, author=author, url=url, text=text)
+
+
 class PromptTemplates:
     """
     Prompt 模板集合
@@ -21,34 +41,37 @@ class PromptTemplates:
     - Executive Summary prompt
     """
 
+    # ============================================================
+    # Prompt 拆分为 system（静态指令，可命中 prompt cache）+ user（本批 items）
+    # system 只依赖 (section, language, is_papers)，相同组合复用同一 cache 前缀
+    # ============================================================
+
     @staticmethod
     def filter_prompt(items: list, section: str, language: str = "zh-CN") -> str:
         """
-        Pass 1: 过滤+精排 prompt
+        Pass 1: 过滤+精排 prompt（system + user 合并的单段版本）
 
         Args:
             items: Item 列表
             section: 频道/分类名称
             language: 语言（zh-CN 或 en-US）
         """
-        if language == "zh-CN":
-            return PromptTemplates._filter_prompt_zh(items, section)
-        else:
-            return PromptTemplates._filter_prompt_en(items, section)
+        return (
+            PromptTemplates.filter_system(section, language)
+            + "\n\n"
+            + PromptTemplates.filter_user(items, language)
+        )
 
     @staticmethod
-    def _filter_prompt_zh(items: list, section: str) -> str:
-        """中文过滤+精排 prompt"""
-        items_text = "\n\n".join([
-            f"ID: {i}\n标题: {item.title}\n来源: {PromptTemplates._get_display_source(item)} | 作者: {item.author}\n内容: {item.text[:500]}"
-            for i, item in enumerate(items)
-        ])
-
-        return f"""你是一个专业的内容筛选助手。
+    @lru_cache(maxsize=64)
+    def filter_system(section: str, language: str = "zh-CN") -> str:
+        """Pass 1 静态指令"""
+        if language == "zh-CN":
+            return f"""你是一个专业的内容筛选助手。
 
 {OWNER_PROFILE}
 
-请从以下 {section} 领域的内容中，筛选出**对这位读者真正有价值**的内容。
+请从用户提供的 {section} 领域的内容中，筛选出**对这位读者真正有价值**的内容。
 
 # 筛选标准
 - ✅ 保留：与 AI/LLM/Crypto/量化/开源工具 直接相关的高质量内容
@@ -57,29 +80,85 @@ class PromptTemplates:
 - ❌ 排除：营销软文、低质量内容、纯新闻稿、重复信息
 - ❌ 排除：与读者领域无关的一般科技新闻
 
-# 待筛选内容
-{items_text}
-
 # 输出格式
 请只返回通过筛选的内容的 ID 列表（用逗号分隔的数字），例如：0,3,7,12
 
-如果所有内容都不合格，返回：NONE
+如果所有内容都不合格，返回：NONE"""
+        return f"""You are a professional content curator.
+
+{OWNER_PROFILE}
+
+Please filter high-quality, valuable content from the {section} items provided by the user, focusing on what matters to this reader.
 
-ID列表:"""
+# Filtering Criteria
+- ✅ Keep: Directly relevant to AI/LLM/Crypto/Quantitative/Open-source tools
+- ✅ Keep: Major news, technical breakthroughs, deep analysis, useful tools
+- ❌ Exclude: Marketing, low-quality, duplicates, press releases
+- ❌ Exclude: General tech news unrelated to the reader's focus areas
+
+# Output Format
+Return only the IDs of selected items (comma-separated numbers), e.g.: 0,3,7,12
+
+If nothing passes, return: NONE"""
 
     @staticmethod
-    def _filter_prompt_en(items: list, section: str) -> str:
-        """英文过滤+精排 prompt"""
+    def filter_user(items: list, language: str = "zh-CN") -> str:
+        """Pass 1 本批 items"""
+        if language == "zh-CN":
+            items_text = "\n\n".join([
+                f"ID: {i}\n{PromptTemplates._item_block(_FILTER_ITEM_ZH, item, 500)}"
+                for i, item in enumerate(items)
+            ])
+            return f"# 待筛选内容\n{items_text}\n\nID列表:"
         items_text = "\n\n".join([
-            f"ID: {i}\nTitle: {item.title}\nSource: {PromptTemplates._get_display_source(item)} | Author: {item.author}\nContent: {item.text[:500]}"
+            f"ID: {i}\n{PromptTemplates._item_block(_FILTER_ITEM_EN, item, 500)}"
             for i, item in enumerate(items)
         ])
+        return f"# Content to Filter\n{items_text}\n\nIDs:"
+
+    @staticmethod
+    def filter_prompt_multi(sections_items: dict, language: str = "zh-CN") -> str:
+        """
+        Pass 1 (批量): 多个 section 合并到一次过滤请求（单段版本）
+
+        Args:
+            sections_items: {section: [Item]}，每个 section 内 ID 从 0 开始
+            language: 语言（zh-CN 或 en-US）
+        """
+        return (
+            PromptTemplates.filter_multi_system(language)
+            + "\n\n"
+            + PromptTemplates.filter_multi_user(sections_items, language)
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def filter_multi_system(language: str = "zh-CN") -> str:
+        """Pass 1 (批量) 静态指令，与 section 无关"""
+        if language == "zh-CN":
+            return f"""你是一个专业的内容筛选助手。
 
+{OWNER_PROFILE}
+
+用户提供的内容按领域分为多个 SECTION，请在每个 SECTION 内分别筛选出**对这位读者真正有价值**的内容。
+
+# 筛选标准
+- ✅ 保留：与 AI/LLM/Crypto/量化/开源工具 直接相关的高质量内容
+- ✅ 保留：重大新闻、技术突破、深度分析、实用工具
+- ✅ 保留：有数据支撑的市场分析、链上洞察
+- ❌ 排除：营销软文、低质量内容、纯新闻稿、重复信息
+- ❌ 排除：与读者领域无关的一般科技新闻
+
+# 输出格式（JSON）
+返回一个 JSON 对象，key 为 SECTION 名，value 为该 SECTION 内通过筛选的 ID 数字列表（ID 中冒号后的数字），例如：
+{{"ai": [0, 3], "crypto": [1]}}
+
+某个 SECTION 全部不合格时返回空列表。只返回 JSON，不要其他内容。"""
         return f"""You are a professional content curator.
 
 {OWNER_PROFILE}
 
-Please filter high-quality, valuable content from the following {section} items, focusing on what matters to this reader.
+The items provided by the user are grouped into several SECTIONs. Within each SECTION, filter the high-quality, valuable content that matters to this reader.
 
 # Filtering Criteria
 - ✅ Keep: Directly relevant to AI/LLM/Crypto/Quantitative/Open-source tools
@@ -87,30 +166,44 @@ Please filter high-quality, valuable content from the following {section} items,
 - ❌ Exclude: Marketing, low-quality, duplicates, press releases
 - ❌ Exclude: General tech news unrelated to the reader's focus areas
 
-# Content to Filter
-{items_text}
+# Output Format (JSON)
+Return a JSON object keyed by SECTION name; each value is the list of selected numeric IDs within that SECTION (the number after the colon), e.g.:
+{{"ai": [0, 3], "crypto": [1]}}
 
-# Output Format
-Return only the IDs of selected items (comma-separated numbers), e.g.: 0,3,7,12
+Use an empty list for a SECTION where nothing passes. Return ONLY JSON, nothing else."""
 
-If nothing passes, return: NONE
+    @staticmethod
+    def filter_multi_user(sections_items: dict, language: str = "zh-CN") -> str:
+        """Pass 1 (批量) 本批各 section 的 items"""
+        template = _FILTER_ITEM_ZH if language == "zh-CN" else _FILTER_ITEM_EN
+        blocks = []
+        for section, items in sections_items.items():
+            items_text = "\n\n".join([
+                f"ID: {section}:{i}\n{PromptTemplates._item_block(template, item, 500)}"
+                for i, item in enumerate(items)
+            ])
+            blocks.append(f"=== SECTION: {section} ===\n{items_text}")
+        sections_text = "\n\n".join(blocks)
 
-IDs:"""
+        if language == "zh-CN":
+            return f"# 待筛选内容\n{sections_text}\n\nJSON:"
+        return f"# Content to Filter\n{sections_text}\n\nJSON:"
 
     @staticmethod
     def extract_prompt(items: list, section: str, language: str = "zh-CN") -> str:
         """
-        Pass 2: 结构化提取 prompt（增强版）
+        Pass 2: 结构化提取 prompt（增强版，单段版本）
 
         Args:
             items: 筛选后的 Item 列表
             section: 频道/分类名称
             language: 语言
         """
-        if language == "zh-CN":
-            return PromptTemplates._extract_prompt_zh(items, section)
-        else:
-            return PromptTemplates._extract_prompt_en(items, section)
+        return (
+            PromptTemplates.extract_system(section, language)
+            + "\n\n"
+            + PromptTemplates.extract_user(items, language)
+        )
 
     @staticmethod
     def _get_display_source(item) -> str:
@@ -119,21 +212,56 @@ IDs:"""
         return meta.get('feed_name') or meta.get('feed_title') or getattr(item, 'source', 'unknown')
 
     @staticmethod
-    def _extract_prompt_zh(items: list, section: str) -> str:
-        """中文提取 prompt（v0.2.0 增强版）"""
+    def _item_block(template: str, item, text_limit: int) -> str:
+        """渲染单条 item（带缓存）"""
+        return _render_item_block(
+            template,
+            item.title,
+            PromptTemplates._get_display_source(item),
+            item.author,
+            item.url,
+            item.text[:text_limit],
+        )
+
+    @staticmethod
+    def clear_caches():
+        """清空渲染缓存（长驻进程使用）"""
+        _render_item_block.cache_clear()
+
+    @staticmethod
+    def extract_system(section: str, language: str = "zh-CN", is_papers: bool = False) -> str:
+        """Pass 2 静态指令，papers section 使用专用版本"""
+        if is_papers:
+            return PromptTemplates._extract_system_papers(language)
+        return PromptTemplates._extract_system(section, language)
+
+    @staticmethod
+    def extract_user(items: list, language: str = "zh-CN", is_papers: bool = False) -> str:
+        """Pass 2 本批 items"""
+        if is_papers:
+            return PromptTemplates._extract_user_papers(items, language)
+        if language == "zh-CN":
+            items_text = "\n\n".join([
+                f"【{i+1}】\n{PromptTemplates._item_block(_EXTRACT_ITEM_ZH, item, 800)}"
+                for i, item in enumerate(items)
+            ])
+            return f"# 内容\n{items_text}\n\nJSON:"
         items_text = "\n\n".join([
-            f"【{i+1}】\n标题: {item.title}\n来源: {PromptTemplates._get_display_source(item)} | 作者: {item.author}\n链接: {item.url}\n内容: {item.text[:800]}"
+            f"【{i+1}】\n{PromptTemplates._item_block(_EXTRACT_ITEM_EN, item, 800)}"
             for i, item in enumerate(items)
         ])
+        return f"# Content\n{items_text}\n\nJSON:"
 
-        return f"""你是一个专业的技术编辑，服务于一位 AI 算法工程师 + Crypto 量化研究者。
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _extract_system(section: str, language: str) -> str:
+        """提取 prompt 静态指令（v0.2.0 增强版）"""
+        if language == "zh-CN":
+            return f"""你是一个专业的技术编辑，服务于一位 AI 算法工程师 + Crypto 量化研究者。
 
 {OWNER_PROFILE}
 
-请将以下 {section} 领域的内容提炼成结构化的日报条目。
-
-# 内容
-{items_text}
+请将用户提供的 {section} 领域的内容提炼成结构化的日报条目。
 
 # 输出要求
 请为每条内容生成：
@@ -165,26 +293,12 @@ IDs:"""
 ]
 ```
 
-只返回 JSON，不要其他内容。
-
-JSON:"""
-
-    @staticmethod
-    def _extract_prompt_en(items: list, section: str) -> str:
-        """英文提取 prompt（v0.2.0 增强版）"""
-        items_text = "\n\n".join([
-            f"【{i+1}】\nTitle: {item.title}\nSource: {PromptTemplates._get_display_source(item)} | Author: {item.author}\nURL: {item.url}\nContent: {item.text[:800]}"
-            for i, item in enumerate(items)
-        ])
-
+只返回 JSON，不要其他内容。"""
         return f"""You are a professional tech editor serving an AI engineer + Crypto quant researcher.
 
 {OWNER_PROFILE}
 
-Please distill the following {section} content into structured daily brief entries.
-
-# Content
-{items_text}
+Please distill the {section} content provided by the user into structured daily brief entries.
 
 # Requirements
 For each item, generate:
@@ -215,9 +329,7 @@ For each item, generate:
 ]
 ```
 
-Return ONLY JSON, nothing else.
-
-JSON:"""
+Return ONLY JSON, nothing else."""
 
     # ============================================================
     # Papers section 专用 extract prompt
@@ -226,39 +338,57 @@ JSON:"""
     @staticmethod
     def extract_prompt_papers(items: list, section: str, language: str = "zh-CN") -> str:
         """
-        Pass 2 (papers): 论文专用结构化提取 prompt
+        Pass 2 (papers): 论文专用结构化提取 prompt（单段版本）
 
         额外提取：authors, arxiv_id, research_tags, practicality_score
         """
-        if language == "zh-CN":
-            return PromptTemplates._extract_prompt_papers_zh(items, section)
-        else:
-            return PromptTemplates._extract_prompt_papers_en(items, section)
+        return (
+            PromptTemplates.extract_system(section, language, is_papers=True)
+            + "\n\n"
+            + PromptTemplates.extract_user(items, language, is_papers=True)
+        )
 
     @staticmethod
-    def _extract_prompt_papers_zh(items: list, section: str) -> str:
-        """中文论文专用提取 prompt"""
+    def _extract_user_papers(items: list, language: str) -> str:
+        """论文列表"""
+        if language == "zh-CN":
+            items_text = "\n\n".join([
+                (
+                    f"【{i+1}】\n"
+                    f"标题: {item.title}\n"
+                    f"作者: {item.author}\n"
+                    f"arXiv ID: {(getattr(item, 'metadata', None) or {}).get('arxiv_id', 'N/A')}\n"
+                    f"分类: {', '.join((getattr(item, 'metadata', None) or {}).get('categories', []))}\n"
+                    f"链接: {item.url}\n"
+                    f"摘要: {item.text[:800]}"
+                )
+                for i, item in enumerate(items)
+            ])
+            return f"# 论文列表\n{items_text}\n\nJSON:"
         items_text = "\n\n".join([
             (
                 f"【{i+1}】\n"
-                f"标题: {item.title}\n"
-                f"作者: {item.author}\n"
+                f"Title: {item.title}\n"
+                f"Authors: {item.author}\n"
                 f"arXiv ID: {(getattr(item, 'metadata', None) or {}).get('arxiv_id', 'N/A')}\n"
-                f"分类: {', '.join((getattr(item, 'metadata', None) or {}).get('categories', []))}\n"
-                f"链接: {item.url}\n"
-                f"摘要: {item.text[:800]}"
+                f"Categories: {', '.join((getattr(item, 'metadata', None) or {}).get('categories', []))}\n"
+                f"URL: {item.url}\n"
+                f"Abstract: {item.text[:800]}"
             )
             for i, item in enumerate(items)
         ])
+        return f"# Papers\n{items_text}\n\nJSON:"
 
-        return f"""你是一个专业的 AI 论文编辑，服务于一位 AI 算法工程师 + Crypto 量化研究者。
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _extract_system_papers(language: str) -> str:
+        """论文专用提取 prompt 静态指令"""
+        if language == "zh-CN":
+            return f"""你是一个专业的 AI 论文编辑，服务于一位 AI 算法工程师 + Crypto 量化研究者。
 
 {OWNER_PROFILE}
 
-请将以下学术论文提炼成结构化的日报条目。
-
-# 论文列表
-{items_text}
+请将用户提供的学术论文提炼成结构化的日报条目。
 
 # 输出要求
 请为每篇论文生成：
@@ -296,34 +426,12 @@ JSON:"""
 ]
 ```
 
-只返回 JSON，不要其他内容。
-
-JSON:"""
-
-    @staticmethod
-    def _extract_prompt_papers_en(items: list, section: str) -> str:
-        """英文论文专用提取 prompt"""
-        items_text = "\n\n".join([
-            (
-                f"【{i+1}】\n"
-                f"Title: {item.title}\n"
-                f"Authors: {item.author}\n"
-                f"arXiv ID: {(getattr(item, 'metadata', None) or {}).get('arxiv_id', 'N/A')}\n"
-                f"Categories: {', '.join((getattr(item, 'metadata', None) or {}).get('categories', []))}\n"
-                f"URL: {item.url}\n"
-                f"Abstract: {item.text[:800]}"
-            )
-            for i, item in enumerate(items)
-        ])
-
+只返回 JSON，不要其他内容。"""
         return f"""You are a professional AI research editor serving an AI engineer + Crypto quant researcher.
 
 {OWNER_PROFILE}
 
-Please distill the following academic papers into structured daily brief entries.
-
-# Papers
-{items_text}
+Please distill the academic papers provided by the user into structured daily brief entries.
 
 # Requirements
 For each paper, generate:
@@ -361,9 +469,7 @@ For each paper, generate:
 ]
 ```
 
-Return ONLY JSON, nothing else.
-
-JSON:"""
+Return ONLY JSON, nothing else."""
 
     @staticmethod
     def executive_summary_prompt(briefs: dict, section_configs: dict, language: str = "zh-CN") -> str:
@@ -7,6 +7,12 @@
 4. 分级标注：🔴必读 / 🟡推荐 / 🟢了解
 """
 
+from functools import lru_cache
+
+
+# prompt 模板版本：修改精排 / 洞察 prompt 或输出格式时递增，使响应缓存失效
+PROMPT_VERSION = 1
+
 
 # ============================================================
 # 用户画像（注入 system prompt）
@@ -36,86 +42,89 @@ class PromptsV2:
     def system_prompt() -> str:
         return USER_CONTEXT
 
+    # ============================================================
+    # 精排 / 洞察 prompt 拆分为 system（用户画像 + 静态指令，可命中 prompt cache）
+    # + user（本批候选）；system 只依赖 section
+    # ============================================================
+
     @staticmethod
     def fine_rank_prompt(items: list, section: str) -> str:
         """
-        精排 prompt — AI 评估每条内容的价值
+        精排 prompt — AI 评估每条内容的价值（不含用户画像的单段版本）
         
         输出：结构化 JSON，每条带 relevance/impact/urgency 分数
         """
-        items_text = "\n\n".join([
-            f"[{i}] 标题: {item.title}\n"
-            f"来源: {_get_source(item)} | 粗排分: {item.score:.1f}\n"
-            f"内容: {item.text[:600]}"
-            for i, item in enumerate(items)
-        ])
+        return _fine_rank_instructions(section) + "\n\n" + PromptsV2.fine_rank_user(items)
 
-        return f"""精排任务：从 {section} 领域的候选内容中，评估每条的价值并排序。
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def fine_rank_system(section: str) -> str:
+        """精排 system：用户画像 + 静态指令"""
+        return USER_CONTEXT + "\n\n" + _fine_rank_instructions(section)
 
-# 评分维度（每项 1-10 分）
-- **relevance**：与读者兴趣的相关性（参考读者画像）
-- **impact**：对行业/市场的影响力、信息的独特性
-- **urgency**：时效性，是否需要立即关注
+    @staticmethod
+    def fine_rank_user(items: list) -> str:
+        """精排本批候选"""
+        return f"""# 候选内容
+{_fine_rank_items_text(items)}
 
-# 候选内容
-{items_text}
+只返回 JSON 数组。"""
 
-# 输出要求
-1. 评估每条内容，给出三维评分
-2. 按综合价值降序排列
-3. 淘汰明显低质量的内容（综合分 < 12 的不要）
-4. 标注优先级：🔴(综合≥24) / 🟡(18-23) / 🟢(12-17)
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def multi_section_fine_rank_system() -> str:
+        """多 section 合并精排 system：用户画像 + 静态指令，与 section 无关"""
+        return USER_CONTEXT + "\n\n" + f"""精排任务：用户会提供多个领域（section）的候选内容，每个 section 用 <section id="..."> 包裹，section 内 ID 从 0 开始。请分别评估每个 section 内每条内容的价值并排序。
+
+{_FINE_RANK_CRITERIA}
+5. 每个 section 单独输出，id 为该 section 内的 ID；没有合格内容的 section 返回空数组
 
 ```json
-[
-  {{
-    "id": 0,
-    "relevance": 8,
-    "impact": 9,
-    "urgency": 7,
-    "total": 24,
-    "priority": "🔴",
-    "reason": "一句话说明为什么重要"
+{{
+  "sections": {{
+    "ai": [
+      {{"id": 0, "relevance": 8, "impact": 9, "urgency": 7, "total": 24, "priority": "🔴", "reason": "一句话说明为什么重要"}}
+    ],
+    "crypto": []
   }}
-]
-```
+}}
+```"""
 
-只返回 JSON 数组。"""
+    @staticmethod
+    def multi_section_fine_rank_user(sections_items: dict) -> str:
+        """多 section 合并精排的候选内容，{section: [Item]}"""
+        blocks = "\n\n".join(
+            f'<section id="{section}">\n{_fine_rank_items_text(items)}\n</section>'
+            for section, items in sections_items.items()
+        )
+        return f"""# 候选内容
+{blocks}
+
+只返回 JSON 对象。"""
 
     @staticmethod
     def insight_extract_prompt(items: list, section: str) -> str:
         """
-        洞察提取 prompt — 生成带深度分析的日报条目（so-what 强制）
+        洞察提取 prompt — 生成带深度分析的日报条目（so-what 强制，不含用户画像的单段版本）
         """
+        return _insight_instructions(section) + "\n\n" + PromptsV2.insight_extract_user(items)
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def insight_extract_system(section: str) -> str:
+        """洞察提取 system：用户画像 + 静态指令"""
+        return USER_CONTEXT + "\n\n" + _insight_instructions(section)
+
+    @staticmethod
+    def insight_extract_user(items: list) -> str:
+        """洞察提取本批内容"""
         items_text = "\n\n".join([
             f"[{i}] {item.title}\n来源: {_get_source(item)} | 链接: {item.url}\n摘要: {item.text[:400]}"
             for i, item in enumerate(items)
         ])
-
-        return f"""为 {section} 板块生成日报条目。
-
-# 内容
+        return f"""# 内容
 {items_text}
 
-# 输出格式
-为每条生成 JSON 对象：
-- **headline**：一句话标题（15-25字），直接说核心价值，不是新闻标题的复制
-- **detail**：2-3 句。第一句是核心事实（数据要具体）；第二句是**so-what**，即"这对读者意味着什么、影响哪个决策、需要怎么响应"；可选第三句是背景或风险提示
-- **so_what**：单独提取的行动/决策建议（10-20字），如"立即评估供应商替代方案"、"关注链上大额转移信号"
-- **priority**：🔴必读（直接影响决策） / 🟡推荐（今天应知） / 🟢了解（背景信息）
-- **tags**：1-2 个精准标签
-
-风格规范：
-- 说人话，有立场，技术术语保留英文
-- 数字要具体（不说"大幅增长"，要说"+73%"）
-- 过滤掉没有实质内容的条目（如"X公司宣布将在未来探索AI"）
-- 主动识别：这是信号还是噪音？
-- 时效性核查：对AI模型版本号、产品发布等快速迭代领域，判断是否已被更新版本覆盖（如当前已是GLM-5，报道GLM-4.7则降级并注明）；旧闻直接过滤
-
-```json
-[{{"headline":"标题","detail":"事实。so-what分析。","so_what":"行动建议","url":"链接","source":"来源","priority":"🔴","tags":["#标签"]}}]
-```
-
 只返回 JSON 数组。"""
 
     @staticmethod
@@ -209,3 +218,67 @@ def _get_source(item) -> str:
     """获取人类可读的来源名"""
     meta = getattr(item, 'metadata', {}) or {}
     return meta.get('feed_name') or meta.get('feed_title') or getattr(item, 'source', 'unknown')
+
+
+_FINE_RANK_CRITERIA = """# 评分维度（每项 1-10 分）
+- **relevance**：与读者兴趣的相关性（参考读者画像）
+- **impact**：对行业/市场的影响力、信息的独特性
+- **urgency**：时效性，是否需要立即关注
+
+# 输出要求
+1. 评估每条内容，给出三维评分
+2. 按综合价值降序排列
+3. 淘汰明显低质量的内容（综合分 < 12 的不要）
+4. 标注优先级：🔴(综合≥24) / 🟡(18-23) / 🟢(12-17)"""
+
+
+def _fine_rank_items_text(items: list) -> str:
+    return "\n\n".join([
+        f"[{i}] 标题: {item.title}\n"
+        f"来源: {_get_source(item)} | 粗排分: {item.score:.1f}\n"
+        f"内容: {item.text[:600]}"
+        for i, item in enumerate(items)
+    ])
+
+
+def _fine_rank_instructions(section: str) -> str:
+    return f"""精排任务：从 {section} 领域的候选内容中，评估每条的价值并排序。候选内容由用户提供。
+
+{_FINE_RANK_CRITERIA}
+
+```json
+[
+  {{
+    "id": 0,
+    "relevance": 8,
+    "impact": 9,
+    "urgency": 7,
+    "total": 24,
+    "priority": "🔴",
+    "reason": "一句话说明为什么重要"
+  }}
+]
+```"""
+
+
+def _insight_instructions(section: str) -> str:
+    return f"""为 {section} 板块生成日报条目。内容由用户提供。
+
+# 输出格式
+为每条生成 JSON 对象：
+- **headline**：一句话标题（15-25字），直接说核心价值，不是新闻标题的复制
+- **detail**：2-3 句。第一句是核心事实（数据要具体）；第二句是**so-what**，即"这对读者意味着什么、影响哪个决策、需要怎么响应"；可选第三句是背景或风险提示
+- **so_what**：单独提取的行动/决策建议（10-20字），如"立即评估供应商替代方案"、"关注链上大额转移信号"
+- **priority**：🔴必读（直接影响决策） / 🟡推荐（今天应知） / 🟢了解（背景信息）
+- **tags**：1-2 个精准标签
+
+风格规范：
+- 说人话，有立场，技术术语保留英文
+- 数字要具体（不说"大幅增长"，要说"+73%"）
+- 过滤掉没有实质内容的条目（如"X公司宣布将在未来探索AI"）
+- 主动识别：这是信号还是噪音？
+- 时效性核查：对AI模型版本号、产品发布等快速迭代领域，判断是否已被更新版本覆盖（如当前已是GLM-5，报道GLM-4.7则降级并注明）；旧闻直接过滤
+
+```json
+[{{"headline":"标题","detail":"事实。so-what分析。","so_what":"行动建议","url":"链接","source":"来源","priority":"🔴","tags":["#标签"]}}]
+```"""
@@ -1,6 +1,7 @@
 """Main pipeline orchestrator"""
 
 import argparse
+import functools
 import yaml
 import os
 from pathlib import Path
@@ -14,25 +15,31 @@ from utils.state import StateManager
 from utils.time_utils import get_date_str
 
 
+_BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+@functools.lru_cache(maxsize=None)
+def _ensure_dir(path: Path) -> Path:
+    """Create a directory once per process"""
+    path.mkdir(exist_ok=True)
+    return path
+
+
 class Pipeline:
     """Main pipeline orchestrator for multi-source daily report"""
 
     def __init__(self, config_path: str = None):
         # Set default config path
         if config_path is None:
-            config_path = Path(__file__).parent.parent / 'config' / 'config.yaml'
+            config_path = _BASE_DIR / 'config' / 'config.yaml'
 
         self.config_path = Path(config_path)
         self.config = self._load_config()
 
-        # Initialize paths
-        self.base_dir = Path(__file__).parent.parent
-        self.data_dir = self.base_dir / 'data'
-        self.reports_dir = Path(self.config['output']['base_dir'])
-
-        # Create directories
-        self.data_dir.mkdir(exist_ok=True)
-        self.reports_dir.mkdir(exist_ok=True)
+        # Initialize paths (directories are created at most once per process)
+        self.base_dir = _BASE_DIR
+        self.data_dir = _ensure_dir(self.base_dir / 'data')
+        self.reports_dir = _ensure_dir(Path(self.config['output']['base_dir']))
 
     def _load_config(self) -> dict:
         """Load and process configuration"""
@@ -101,7 +108,10 @@ class Pipeline:
             # Fetch data
             fetcher = ParallelFetcher(sources, state_manager)
             hours_ago = self.config['pipeline']['fetch']['hours_ago']
-            items = fetcher.fetch_all(hours_ago=hours_ago)
+            try:
+                items = fetcher.fetch_all(hours_ago=hours_ago)
+            finally:
+                fetcher.close()
 
             # Save raw data
             raw_path = self.data_dir / 'raw' / f'{date_str}.jsonl'
@@ -177,20 +187,24 @@ class Pipeline:
                 # 初始化分析器
                 analyzer = AIAnalyzer(
                     claude_client=claude,
-                    language=self.config['project'].get('language', 'zh-CN')
+                    language=self.config['project'].get('language', 'zh-CN'),
+                    config=self.config['pipeline']['analyze']
                 )
 
-                # 加载 section_configs（用于 Executive Summary）
-                sections_config_path = self.config_path.parent / 'sections.yaml'
-                section_configs = {}
-                if sections_config_path.exists():
-                    with open(sections_config_path) as sf:
-                        section_configs = yaml.safe_load(sf).get('sections', {})
-
-                # 分析
-                two_pass = self.config['pipeline']['analyze'].get('two_pass_enabled', True)
-                briefs = analyzer.analyze(items, two_pass=two_pass,
-                                          section_configs=section_configs)
+                try:
+                    # 加载 section_configs（用于 Executive Summary）
+                    sections_config_path = self.config_path.parent / 'sections.yaml'
+                    section_configs = {}
+                    if sections_config_path.exists():
+                        with open(sections_config_path) as sf:
+                            section_configs = yaml.safe_load(sf).get('sections', {})
+
+                    # 分析
+                    two_pass = self.config['pipeline']['analyze'].get('two_pass_enabled', True)
+                    briefs = analyzer.analyze(items, two_pass=two_pass,
+                                              section_configs=section_configs)
+                finally:
+                    analyzer.close()
 
                 # 保存
                 analyzed_path = self.data_dir / 'analyzed' / f'{date_str}.json'
@@ -211,7 +225,7 @@ class Pipeline:
                 analyzed_path = self.data_dir / 'analyzed' / f'{date_str}.json'
                 if analyzed_path.exists():
                     from processors.analyzer import AIAnalyzer
-                    analyzer = AIAnalyzer(claude_client=None)
+                    analyzer = AIAnalyzer(claude_client=None, config={'brief_cache': False})
                     items = analyzer.load_analyzed_data(analyzed_path)
                     print(f"📥 已加载 analyzed data: {sum(len(v) for v in items.values())} 条")
                 else:
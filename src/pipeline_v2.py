@@ -8,11 +8,13 @@ vs 旧版：
 """
 
 import argparse
+import copy
+import functools
 import yaml
 import os
-import json
 import signal
 import sys
+import threading
 from pathlib import Path
 from datetime import datetime, timezone
 
@@ -21,35 +23,76 @@ from processors.fetcher import ParallelFetcher
 from processors.ranker import RankingPipeline
 from processors.analyzer_v2 import AIAnalyzerV2
 from processors.generator_v2 import ReportGeneratorV2
+from utils.json_utils import read_json, read_jsonl, write_jsonl
 from utils.state import StateManager
-from utils.time_utils import get_date_str
+from utils.time_utils import PipelineTimeout, get_date_str
 
 
-class PipelineTimeout(Exception):
-    """Pipeline global timeout exceeded"""
-    pass
+_BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+@functools.lru_cache(maxsize=None)
+def _ensure_dir(path: Path) -> Path:
+    """每个目录每个进程只 mkdir 一次"""
+    path.mkdir(exist_ok=True)
+    return path
+
+
+# briefs 中的元数据 key（非 section 数据）
+META_KEYS = frozenset({"__trends__", "__meta__", "__executive_summary__"})
 
 
 def _timeout_handler(signum, frame):
     raise PipelineTimeout("Pipeline global timeout exceeded (600s)")
 
 
+def _replace_env_vars(obj):
+    if isinstance(obj, dict):
+        return {k: _replace_env_vars(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [_replace_env_vars(item) for item in obj]
+    elif isinstance(obj, str) and obj.startswith("${") and obj.endswith("}"):
+        return os.environ.get(obj[2:-1], "")
+    return obj
+
+
+@functools.lru_cache(maxsize=8)
+def _load_config_cached(path_str: str, mtime_ns: int) -> dict:
+    """按 (绝对路径, mtime) 缓存解析后的 config，文件被修改后自动失效"""
+    with open(path_str) as f:
+        config = yaml.safe_load(f)
+    return _replace_env_vars(config)
+
+
+# 绝对路径 -> (mtime_ns, SourceRegistry)
+_registry_cache: dict = {}
+
+
+def _get_registry(sources_config_path: Path) -> SourceRegistry:
+    """复用同一 sources.yaml 的 SourceRegistry，避免重复解析 YAML"""
+    path = sources_config_path.resolve()
+    mtime_ns = path.stat().st_mtime_ns
+    cached = _registry_cache.get(str(path))
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    registry = SourceRegistry(str(path))
+    _registry_cache[str(path)] = (mtime_ns, registry)
+    return registry
+
+
 class PipelineV2:
     """v2 Pipeline — 推荐系统架构"""
 
     def __init__(self, config_path: str = None):
         if config_path is None:
-            config_path = Path(__file__).parent.parent / "config" / "config.yaml"
+            config_path = _BASE_DIR / "config" / "config.yaml"
 
         self.config_path = Path(config_path)
         self.config = self._load_config()
 
-        self.base_dir = Path(__file__).parent.parent
-        self.data_dir = self.base_dir / "data"
-        self.reports_dir = Path(self.config["output"]["base_dir"])
-
-        self.data_dir.mkdir(exist_ok=True)
-        self.reports_dir.mkdir(exist_ok=True)
+        self.base_dir = _BASE_DIR
+        self.data_dir = _ensure_dir(self.base_dir / "data")
+        self.reports_dir = _ensure_dir(Path(self.config["output"]["base_dir"]))
 
     OBSIDIAN_VAULT = Path("/Users/peterzhang/project/morpheus-vault")
     OBSIDIAN_NEWSLOOM_DIR = OBSIDIAN_VAULT / "日报"
@@ -88,18 +131,10 @@ type: report
             print(f"⚠️ Obsidian 入库失败: {e}")
 
     def _load_config(self) -> dict:
-        with open(self.config_path) as f:
-            config = yaml.safe_load(f)
-        return self._replace_env_vars(config)
-
-    def _replace_env_vars(self, obj):
-        if isinstance(obj, dict):
-            return {k: self._replace_env_vars(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self._replace_env_vars(item) for item in obj]
-        elif isinstance(obj, str) and obj.startswith("${") and obj.endswith("}"):
-            return os.environ.get(obj[2:-1], "")
-        return obj
+        path = self.config_path.resolve()
+        config = _load_config_cached(str(path), path.stat().st_mtime_ns)
+        # 下游可能修改 config，缓存对象不外泄
+        return copy.deepcopy(config)
 
     def run(self, layers: list = None, date_str: str = None):
         """
@@ -137,6 +172,8 @@ type: report
         state_manager = StateManager(state_file, dedup_window)
 
         items = []
+        state_save = None
+        state_save_errors = []
 
         # ============================================================
         # Layer 1: FETCH
@@ -147,7 +184,7 @@ type: report
             print("=" * 60)
 
             sources_config_path = self.config_path.parent / "sources.yaml"
-            registry = SourceRegistry(str(sources_config_path))
+            registry = _get_registry(sources_config_path)
             sources = registry.get_enabled_sources()
 
             if not sources:
@@ -156,12 +193,15 @@ type: report
 
             fetcher = ParallelFetcher(sources, state_manager)
             hours_ago = self.config["pipeline"]["fetch"]["hours_ago"]
-            items = fetcher.fetch_all(hours_ago=hours_ago)
+            try:
+                items = fetcher.fetch_all(hours_ago=hours_ago)
+            finally:
+                fetcher.close()
 
             raw_path = self.data_dir / "raw" / f"{date_str}.jsonl"
             fetcher.save_raw_data(items, raw_path)
-            # NOTE: state_manager.save() 延迟到 pipeline 全部成功后执行
-            # 避免 fetch 成功但后续步骤失败时，新条目被标记为 seen 导致重跑时被 dedup 跳过
+            # NOTE: state_manager.save() 延迟到分析结果落盘之后（跑 analyze 时）或 pipeline 结束时执行，
+            # 避免 fetch 成功但 rank / analyze 失败时，新条目被标记为 seen 导致重跑时被 dedup 跳过
 
         # ============================================================
         # Layer 2: RANK (粗排 + 去重)
@@ -188,9 +228,7 @@ type: report
             # 保存粗排结果
             ranked_path = self.data_dir / "ranked" / f"{date_str}.jsonl"
             ranked_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(ranked_path, "w", encoding="utf-8") as f:
-                for item in items:
-                    f.write(json.dumps(item.to_dict(), ensure_ascii=False) + "\n")
+            write_jsonl(ranked_path, (item.to_dict() for item in items))
             print(f"💾 粗排结果: {ranked_path}")
 
         # ============================================================
@@ -206,11 +244,7 @@ type: report
                 ranked_path = self.data_dir / "ranked" / f"{date_str}.jsonl"
                 if ranked_path.exists():
                     from sources.base import Item
-                    items = []
-                    with open(ranked_path, encoding="utf-8") as f:
-                        for line in f:
-                            if line.strip():
-                                items.append(Item.from_dict(json.loads(line)))
+                    items = [Item.from_dict(data) for data in read_jsonl(ranked_path)]
                     print(f"📥 从粗排文件加载: {len(items)} 条")
                 else:
                     print(f"⚠️  No ranked data for {date_str}")
@@ -221,7 +255,7 @@ type: report
                 print("⚠️  未配置 ANTHROPIC_API_KEY，跳过 AI 分析")
                 return
 
-            from ai.claude import ClaudeClient
+            from ai.claude import BATCH_TIMEOUT, ClaudeClient
             claude = ClaudeClient(
                 api_key=api_key,
                 base_url=self.config["ai"]["claude"].get("base_url") or None,
@@ -233,8 +267,15 @@ type: report
                 claude_client=claude,
                 config=self.config.get("analyze", {}),
             )
+            if analyzer.use_batch_api and 0 < global_timeout < BATCH_TIMEOUT:
+                print(f"⚠️  interactive: false 走 Message Batches API（最长等待 {BATCH_TIMEOUT // 3600}h），"
+                      f"但全局超时只有 {global_timeout}s：batch 未完成时 pipeline 会超时退出并取消 batch，"
+                      f"可调大 NEWSLOOM_GLOBAL_TIMEOUT")
 
-            result = analyzer.analyze(items, top_per_section=12)
+            try:
+                result = analyzer.analyze(items, top_per_section=12)
+            finally:
+                analyzer.close()
 
             # 保存
             analyzed_path = self.data_dir / "analyzed" / f"{date_str}.json"
@@ -257,15 +298,15 @@ type: report
             # Get briefs from analyzed data (handle both old and new format)
             analyzed_briefs = items.get("briefs", items) if isinstance(items, dict) else items
             
-            for section in analyzed_briefs:
-                if section.startswith('__'):
+            for section, section_items in analyzed_briefs.items():
+                if section in META_KEYS or not isinstance(section_items, list):
                     continue
-                if isinstance(analyzed_briefs[section], list):
-                    before = len(analyzed_briefs[section])
-                    analyzed_briefs[section] = deduplicator.deduplicate(analyzed_briefs[section])
-                    after = len(analyzed_briefs[section])
-                    if before != after:
-                        print(f"  🔄 [{section}] 去重: {before} → {after}")
+                before = len(section_items)
+                deduped = deduplicator.deduplicate(section_items)
+                analyzed_briefs[section] = deduped
+                after = len(deduped)
+                if before != after:
+                    print(f"  🔄 [{section}] 去重: {before} → {after}")
 
             # --- 趋势检测 ---
             from processors.trend_detector import TrendDetector
@@ -285,6 +326,19 @@ type: report
             else:
                 items = analyzed_briefs
 
+            # 分析结果已落盘，重跑 generate 不再依赖 fetch，
+            # state 可以在后台保存，与报告生成重叠 I/O
+            if "fetch" in layers:
+                def _save_state():
+                    # 后台线程的异常留给收尾时报告
+                    try:
+                        state_manager.save()
+                    except Exception as e:
+                        state_save_errors.append(e)
+
+                state_save = threading.Thread(target=_save_state, daemon=False)
+                state_save.start()
+
         # ============================================================
         # Layer 4: GENERATE
         # ============================================================
@@ -296,50 +350,51 @@ type: report
             if not items or not isinstance(items, dict):
                 analyzed_path = self.data_dir / "analyzed" / f"{date_str}.json"
                 if analyzed_path.exists():
-                    with open(analyzed_path, encoding="utf-8") as f:
-                        items = json.load(f)
+                    items = read_json(analyzed_path)
                     print(f"📥 从分析文件加载")
                 else:
                     print(f"⚠️  No analyzed data for {date_str}")
                     return
 
-            output_dir = self.reports_dir / date_str
-            generator = ReportGeneratorV2(self.config)
-            generator.generate(items, date_str, output_dir)
-
-            # latest 软链
-            for fmt in ["md", "html", "pdf"]:
-                latest = self.reports_dir / f"latest.{fmt}"
-                report = output_dir / f"report.{fmt}"
-                if report.exists():
-                    if latest.exists() or latest.is_symlink():
-                        latest.unlink()
-                    latest.symlink_to(report)
-
-            # Obsidian 入库
-            self._archive_to_obsidian(output_dir, date_str)
-
-            # ============================================================
-            # RSS Feed 自动生成
-            # ============================================================
-            try:
-                from processors.rss_generator import RSSGenerator
-                rss_gen = RSSGenerator()
-                
-                # 从 analyzed briefs 生成 RSS
-                if isinstance(items, dict) and 'briefs' in items:
-                    briefs = items['briefs']
-                elif isinstance(items, dict):
-                    briefs = items
-                else:
-                    briefs = {}
-                    
-                if briefs:
+            # briefs 全空（无新闻日）时跳过报告渲染、Obsidian 入库和 RSS
+            briefs = items.get("briefs", items)
+            total = sum(
+                len(v) for k, v in briefs.items()
+                if k not in META_KEYS and isinstance(v, list)
+            )
+            if total == 0:
+                print(f"⚠️  No briefs for {date_str}, skipping report generation")
+            else:
+                output_dir = self.reports_dir / date_str
+                generator = ReportGeneratorV2(self.config)
+                generator.generate(items, date_str, output_dir)
+
+                # latest 软链
+                for fmt in ["md", "html", "pdf"]:
+                    latest = self.reports_dir / f"latest.{fmt}"
+                    report = output_dir / f"report.{fmt}"
+                    if report.exists():
+                        if latest.exists() or latest.is_symlink():
+                            latest.unlink()
+                        latest.symlink_to(report)
+
+                # Obsidian 入库
+                if output_dir.exists():
+                    self._archive_to_obsidian(output_dir, date_str)
+
+                # ============================================================
+                # RSS Feed 自动生成
+                # ============================================================
+                try:
+                    from processors.rss_generator import RSSGenerator
+                    rss_gen = RSSGenerator()
+
+                    # 从 analyzed briefs 生成 RSS
                     rss_xml = rss_gen.generate_from_briefs(briefs, date=date_str)
                     rss_gen.save_feed(rss_xml, str(self.reports_dir / "feed.xml"))
                     print("📡 RSS feed updated")
-            except Exception as e:
-                print(f"⚠️ RSS generation failed: {e}")
+                except Exception as e:
+                    print(f"⚠️ RSS generation failed: {e}")
 
         # Cancel global timeout
         try:
@@ -347,9 +402,16 @@ type: report
         except (AttributeError, OSError):
             pass
 
-        # Pipeline 全部成功，现在才保存 state（标记 seen items）
-        # 这样如果中间步骤失败，重跑时这些条目不会被 dedup 跳过
-        if "fetch" in layers:
+        # 跑了 analyze 时 state（标记 seen items）在分析结果落盘后就已后台保存：
+        # 之后 generate 失败也可以直接从 analyzed/ 重跑，不需要重新 fetch 这些条目。
+        # 没跑 analyze 时等到最后才保存，中间步骤失败时重跑不会被 dedup 跳过
+        if state_save is not None:
+            state_save.join()
+            if state_save_errors:
+                print(f"⚠️ State save failed: {state_save_errors[0]}")
+                raise state_save_errors[0]
+            print("💾 State saved (seen items updated)")
+        elif "fetch" in layers:
             state_manager.save()
             print("💾 State saved (seen items updated)")
 
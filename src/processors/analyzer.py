@@ -1,6 +1,8 @@
 """Layer 3: AI 分析器 - Claude 双pass处理 + Executive Summary"""
 
-import json
+import heapq
+import re
+import threading
 from typing import List, Dict
 from pathlib import Path
 from collections import defaultdict
@@ -8,7 +10,17 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from sources.base import Item
 from ai.claude import ClaudeClient
-from ai.prompts import PromptTemplates
+from ai.prompts import PromptTemplates, PROMPT_VERSION
+from utils.text_utils import canonical_url, simhash64, hamming_distance
+from utils.json_utils import write_json, read_json
+from utils.brief_cache import BriefCache
+
+
+# filter 响应中的 ID 数字
+_ID_RE = re.compile(r'\d+')
+
+# 跨运行 brief 缓存的默认位置
+DEFAULT_BRIEF_CACHE = Path(__file__).parent.parent.parent / 'data' / 'cache' / 'briefs.sqlite'
 
 
 class AIAnalyzer:
@@ -34,9 +46,49 @@ class AIAnalyzer:
         self.claude = claude_client
         self.language = language
         self.config = config or {}
+        # API 并发上限（按账号 tier 的 RPM/ITPM 调整），与 section 线程数解耦
+        self._api_slots = threading.Semaphore(
+            self.config.get('max_concurrent_requests', self.MAX_WORKERS)
+        )
+        # 分 pass 的模型；None 表示沿用 ClaudeClient 的默认模型
+        # openai_responses 代理未必提供 Haiku，只在官方协议下默认切换
+        default_pass1 = (
+            self.DEFAULT_PASS1_MODEL
+            if getattr(claude_client, 'protocol', 'anthropic') == 'anthropic' else None
+        )
+        self.pass1_model = self.config.get('pass1_model', default_pass1) or None
+        self.pass2_model = self.config.get('pass2_model') or None
+        # Pass 2 提前结束：已得到足够多 importance >= 4 的 brief 时跳过剩余批次
+        self.target_high_importance = self.config.get(
+            'target_high_importance', self.TARGET_HIGH_IMPORTANCE
+        )
+        # 非交互运行（interactive: false）时 Pass 1/2 走 Message Batches API（约半价，
+        # 但需等待 batch 完成）；仅官方协议支持
+        self.use_batch_api = (
+            not self.config.get('interactive', True)
+            and getattr(claude_client, 'protocol', 'anthropic') == 'anthropic'
+        )
+
+        # Pass 2 结果跨运行缓存（重复出现的文章不再调用 Claude）
+        self.brief_cache = None
+        if self.config.get('brief_cache', True):
+            try:
+                self.brief_cache = BriefCache(self.config.get('brief_cache_path', DEFAULT_BRIEF_CACHE))
+            except Exception as e:
+                print(f"⚠️  Brief 缓存不可用: {e}")
 
-    # Maximum parallel workers for API calls (avoid rate limits)
+    # Maximum parallel API calls (avoid rate limits)
     MAX_WORKERS = 3
+    # Pass 1 只返回 ID 列表，默认用 Haiku（低 TTFT / 低成本）
+    DEFAULT_PASS1_MODEL = "claude-haiku-4-5"
+    # section 数不超过该值时 Executive Summary 也用 pass1 模型
+    SHORT_SUMMARY_SECTIONS = 3
+    # Executive Summary 后台任务最长等待时间（秒）
+    SUMMARY_TIMEOUT = 300
+    # Maximum section-level threads; API calls are gated by _api_slots
+    MAX_SECTION_WORKERS = 8
+    # 单个 section 高分 brief 数达到该值即停止 Pass 2（0 表示不提前结束）
+    TARGET_HIGH_IMPORTANCE = 15
 
     def analyze(self, items: List[Item], two_pass: bool = True,
                 section_configs: dict = None) -> Dict[str, List[Dict]]:
@@ -54,41 +106,59 @@ class AIAnalyzer:
         """
         print(f"\n🧠 AI 分析中...")
         print(f"   模型: {self.claude.model}")
+        print(f"   Pass 1 模型: {self.pass1_model or self.claude.model}")
         print(f"   双pass: {two_pass}")
-        print(f"   并行度: {self.MAX_WORKERS}")
+        if self.use_batch_api:
+            print(f"   Message Batches API: 启用")
 
         # 按 section 分组
         by_section = self._group_by_section(items)
+        section_workers = max(1, min(self.MAX_SECTION_WORKERS, len(by_section)))
+        print(f"   并行度: {section_workers} sections / "
+              f"{self.config.get('max_concurrent_requests', self.MAX_WORKERS)} API")
 
-        # --- 并行处理各 section ---
-        results = {}
+        # 跨 section 去重：同一内容只送 Claude 一次，结果再分发回各 section
+        by_section, aliases = self._dedup_across_sections(by_section)
 
-        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
-            futures = {}
-            for section, section_items in by_section.items():
-                future = executor.submit(
-                    self._analyze_section, section, section_items, two_pass
-                )
-                futures[future] = section
+        # 限流：按 score 降序取 top N
+        by_section = {
+            section: self._limit_section_items(section, section_items)
+            for section, section_items in by_section.items()
+        }
 
-            for future in as_completed(futures):
-                section = futures[future]
-                try:
-                    briefs = future.result()
-                    if briefs:
-                        results[section] = briefs
-                except Exception as e:
-                    print(f"\n  ❌ Section '{section}' 分析失败: {e}")
-
-        # 按 importance 排序每个 section
-        for section in results:
-            results[section] = sorted(
-                results[section],
-                key=lambda x: x.get('importance', 3),
-                reverse=True
+        # Pass 1: 多个 section 合并批量过滤
+        if two_pass:
+            by_section = self._pass1_filter_batched(by_section)
+
+        # --- Pass 2: 各 section 结构化提取 ---
+        results = None
+        if self.use_batch_api:
+            results = self._pass2_extract_via_batch(by_section)
+
+        if results is None:
+            results = self._analyze_sections_parallel(by_section, section_workers)
+
+        self._fan_out_briefs(results, aliases)
+        # item_id 只用于 fan-out / 缓存匹配，不进入分析结果
+        for section_briefs in results.values():
+            for brief in section_briefs:
+                brief.pop('item_id', None)
+
+        # 按 importance 排序每个 section（原地排序）
+        for section_briefs in results.values():
+            section_briefs.sort(key=lambda x: x.get('importance', 3), reverse=True)
+
+        # Executive Summary 依赖排序后的各 section top 内容，后台生成，
+        # 与"个人关注"板块构建并行（个人关注的内容都来自其他 section，summary 不需要它）
+        summary_executor = None
+        summary_future = None
+        if section_configs and self.claude:
+            summary_executor = ThreadPoolExecutor(max_workers=1)
+            summary_future = summary_executor.submit(
+                self._generate_executive_summary, dict(results), section_configs
             )
 
-        # 生成"个人关注"板块 — 依赖所有 section 结果，保持串行
+        # 生成"个人关注"板块 — 依赖所有 section 结果
         if section_configs and 'personal' in section_configs:
             try:
                 personal_briefs = self._build_personal_section(results)
@@ -98,67 +168,162 @@ class AIAnalyzer:
             except Exception as e:
                 print(f"\n  ⚠️  个人关注生成失败: {e}")
 
-        # 生成 Executive Summary — 依赖所有 section 结果，保持串行
-        if section_configs and self.claude:
+        if summary_future is not None:
             try:
-                executive_summary = self._generate_executive_summary(results, section_configs)
+                executive_summary = summary_future.result(timeout=self.SUMMARY_TIMEOUT)
                 if executive_summary:
                     results['__executive_summary__'] = executive_summary
                     print(f"\n  📝 Executive Summary 已生成 ({len(executive_summary)} 字)")
             except Exception as e:
                 print(f"\n  ⚠️  Executive Summary 生成失败: {e}")
+            finally:
+                summary_executor.shutdown(wait=False)
 
         total_briefs = sum(len(b) for k, b in results.items() if k != '__executive_summary__')
         print(f"\n✅ AI 分析完成: {total_briefs} 条 briefs")
+        cache_stats = getattr(self.claude, 'cache_stats', None)
+        if cache_stats and cache_stats['cache_read_input_tokens']:
+            print(f"   Prompt cache 命中: {cache_stats['cache_read_input_tokens']} tokens "
+                  f"(写入 {cache_stats['cache_creation_input_tokens']}, "
+                  f"未缓存 {cache_stats['input_tokens']})")
         return results
 
-    def _analyze_section(self, section: str, section_items: List[Item],
-                         two_pass: bool) -> List[Dict]:
+    def _analyze_sections_parallel(self, by_section: Dict[str, List[Item]],
+                                   section_workers: int) -> Dict[str, List[Dict]]:
+        """逐 section 并行做 Pass 2（交互模式，每批一次 Claude 调用）"""
+        results = {}
+
+        with ThreadPoolExecutor(max_workers=section_workers) as executor:
+            futures = {}
+            for section, section_items in by_section.items():
+                future = executor.submit(
+                    self._analyze_section, section, section_items
+                )
+                futures[future] = section
+
+            for future in as_completed(futures):
+                section = futures[future]
+                try:
+                    briefs = future.result()
+                    if briefs:
+                        results[section] = briefs
+                except Exception as e:
+                    print(f"\n  ❌ Section '{section}' 分析失败: {e}")
+
+        return results
+
+    # SimHash 汉明距离阈值（≤ 3 视为近似重复）
+    SIMHASH_MAX_DISTANCE = 3
+    SIMHASH_MIN_TEXT = 200
+
+    def _dedup_across_sections(self, by_section: Dict[str, List[Item]]):
         """
-        分析单个 section（线程安全，供 ThreadPoolExecutor 调用）
+        按规范化 URL + SimHash(title + text[:1000]) 跨 section 去重
 
-        Args:
-            section: section 名称
-            section_items: 该 section 的 items
-            two_pass: 是否使用双pass处理
+        只比较不同 section 的 item（同一 section 内的重复不在这里处理）。
+        高分 item 作为规范版本保留在自己的 section；其他 section 中的重复项
+        记为 (section, 规范 item) 别名，分析后由 _fan_out_briefs 分发 brief。
 
         Returns:
-            List[Dict]: 该 section 的 briefs
+            (去重后的 by_section, [(section, canonical_item), ...])
         """
+        all_items = [
+            (section, item)
+            for section, section_items in by_section.items()
+            for item in section_items
+        ]
+        all_items.sort(key=lambda pair: pair[1].score, reverse=True)
+
+        by_url = {}
+        # 64 bit 切 4 段 16 bit：汉明距离 ≤ 3 必有一段完全相同
+        bands = defaultdict(list)
+        unique = defaultdict(list)
+        aliases = []
+
+        for section, item in all_items:
+            canonical = by_url.get(canonical_url(item.url)) if item.url else None
+            if canonical is not None and canonical.channel == section:
+                canonical = None
+            # 正文太短（如只有 "Score: X | Comments: Y"）时模板词占主导，不做近似判重
+            has_body = len(item.text) >= self.SIMHASH_MIN_TEXT
+            fingerprint = simhash64(f"{item.title} {item.text[:1000]}") if has_body else 0
+            band_keys = [(b, fingerprint >> (16 * b) & 0xFFFF) for b in range(4)] if has_body else []
+
+            if canonical is None:
+                for key in band_keys:
+                    for other_fp, other in bands[key]:
+                        if other.channel == section:
+                            continue
+                        if hamming_distance(fingerprint, other_fp) <= self.SIMHASH_MAX_DISTANCE:
+                            canonical = other
+                            break
+                    if canonical is not None:
+                        break
+
+            if canonical is not None:
+                if (section, canonical) not in aliases:
+                    aliases.append((section, canonical))
+                continue
+
+            if item.url:
+                # 同 section 内 URL 重复时保留先到（高分）的
+                by_url.setdefault(canonical_url(item.url), item)
+            for key in band_keys:
+                bands[key].append((fingerprint, item))
+            unique[section].append(item)
+
+        removed = len(all_items) - sum(len(v) for v in unique.values())
+        if removed:
+            print(f"   🔄 跨 section 去重: 移除 {removed} 条重复")
+        return unique, aliases
+
+    @staticmethod
+    def _fan_out_briefs(results: Dict[str, List[Dict]], aliases: list):
+        """把规范 item 的 brief 复制到引用它的其他 section（按 Pass 2 带上的 item_id 匹配）"""
+        for section, canonical in aliases:
+            for brief in results.get(canonical.channel, []):
+                if brief.get('item_id') == canonical.id:
+                    results.setdefault(section, []).append(dict(brief))
+                    break
+
+    def _limit_section_items(self, section: str, section_items: List[Item]) -> List[Item]:
+        """限流：按 score 降序取 top N（默认 30，可通过 config 配置）"""
         print(f"\n  📁 分析 section '{section}': {len(section_items)} 条")
 
-        # 限流：按 score 降序取 top N（默认 30，可通过 config 配置）
         max_per_section = self.config.get('max_items_per_section', 30)
         if len(section_items) > max_per_section:
-            section_items = sorted(section_items, key=lambda x: x.score, reverse=True)[:max_per_section]
+            section_items = heapq.nlargest(max_per_section, section_items, key=lambda x: x.score)
             print(f"     📊 [{section}] 限流: 取 top {max_per_section} 条（按 score 排序）")
+        return section_items
 
-        if two_pass:
-            # Pass 1: 过滤
-            filtered_items = self._pass1_filter(section_items, section)
-            print(f"     ✓ [{section}] Pass 1 过滤: {len(filtered_items)}/{len(section_items)}")
-
-            # Pass 2: 提取
-            if filtered_items:
-                briefs = self._pass2_extract(filtered_items, section)
-                print(f"     ✓ [{section}] Pass 2 提取: {len(briefs)} 条 briefs")
-                return briefs
+    def _analyze_section(self, section: str, section_items: List[Item]) -> List[Dict]:
+        """
+        分析单个 section（线程安全，供 ThreadPoolExecutor 调用）
+
+        Pass 1 过滤已在 analyze() 中跨 section 批量完成，这里只做结构化提取。
+
+        Args:
+            section: section 名称
+            section_items: 该 section 的 items（已限流 / 过滤）
+
+        Returns:
+            List[Dict]: 该 section 的 briefs
+        """
+        if not section_items:
             return []
-        else:
-            # 单pass：直接提取
-            briefs = self._pass2_extract(section_items, section)
-            print(f"     ✓ [{section}] 提取: {len(briefs)} 条 briefs")
-            return briefs
+
+        briefs = self._pass2_extract(section_items, section)
+        print(f"     ✓ [{section}] 提取: {len(briefs)} 条 briefs")
+        return briefs
 
     def _group_by_section(self, items: List[Item]) -> Dict[str, List[Item]]:
         """按 section/channel 分组"""
         by_section = defaultdict(list)
 
         for item in items:
-            section = item.channel
-            by_section[section].append(item)
+            by_section[item.channel].append(item)
 
-        return dict(by_section)
+        return by_section
 
     def _pass1_filter(self, items: List[Item], section: str) -> List[Item]:
         """
@@ -175,24 +340,22 @@ class AIAnalyzer:
             if len(batches) > 1:
                 print(f"     📦 批次 {batch_idx + 1}/{len(batches)}: {len(batch)} 条")
 
-            # 生成 prompt
-            prompt = PromptTemplates.filter_prompt(batch, section, self.language)
+            # 生成 prompt（静态指令走 system，可命中 prompt cache）
+            prompt = PromptTemplates.filter_user(batch, self.language)
 
             # 调用 Claude
             try:
-                response = self.claude.call(
-                    prompt=prompt,
-                    max_tokens=1000,
-                    temperature=0.2
-                )
-
-                # 解析 IDs
-                selected_ids = self._parse_ids(response)
-
-                # 提取对应的 items
-                for item_id in selected_ids:
-                    if 0 <= item_id < len(batch):
-                        filtered_items.append(batch[item_id])
+                with self._api_slots:
+                    response = self.claude.call(
+                        prompt=prompt,
+                        system_blocks=self._filter_system_blocks(section),
+                        max_tokens=self._filter_max_tokens(len(batch)),
+                        temperature=0.2,
+                        model_override=self.pass1_model,
+                        allow_truncated=False,
+                    )
+
+                filtered_items.extend(self._select_by_ids(response, batch))
 
             except Exception as e:
                 print(f"     ⚠️  Pass 1 失败: {e}")
@@ -201,6 +364,194 @@ class AIAnalyzer:
 
         return filtered_items
 
+    @staticmethod
+    def _filter_max_tokens(n_items: int, n_sections: int = 1) -> int:
+        """
+        Pass 1 输出预算：按全部保留的最坏情况给每个 ID 留 token
+
+        ID 列表被截断时会静默丢条目、或把半截 ID（12 → 1）当成别的条目，
+        所以调用时同时要求 allow_truncated=False，截断按失败处理（保留整批）。
+        """
+        if n_sections > 1:
+            return max(512, 6 * n_items + 16 * n_sections)
+        return max(256, 3 * n_items + 16)
+
+    def _filter_system_blocks(self, section: str) -> list:
+        return self.claude.cache_blocks(PromptTemplates.filter_system(section, self.language))
+
+    def _select_by_ids(self, response: str, batch: List[Item]) -> List[Item]:
+        """按 Pass 1 返回的 ID 提取对应的 items"""
+        return [
+            batch[item_id]
+            for item_id in self._parse_ids(response)
+            if 0 <= item_id < len(batch)
+        ]
+
+    def _pass1_filter_batched(self, sections_items: Dict[str, List[Item]]) -> Dict[str, List[Item]]:
+        """
+        Pass 1 (批量): 把多个小 section 打包进同一次 Claude 请求
+
+        按 token 预算贪心打包 section；只含一个 section 的包（或单个超预算的
+        section）走普通的 _pass1_filter。
+        """
+        max_tokens = 80000
+        packs = []
+        current_pack = {}
+        current_tokens = 0
+
+        for section, items in sections_items.items():
+            section_tokens = sum(self.claude.estimate_item_tokens(item) for item in items)
+            if current_tokens + section_tokens > max_tokens and current_pack:
+                packs.append(current_pack)
+                current_pack = {}
+                current_tokens = 0
+            current_pack[section] = items
+            current_tokens += section_tokens
+
+        if current_pack:
+            packs.append(current_pack)
+
+        filtered = None
+        if self.use_batch_api:
+            filtered = self._filter_packs_via_batch(packs)
+
+        if filtered is None:
+            filtered = {}
+            with ThreadPoolExecutor(max_workers=max(1, len(packs))) as executor:
+                futures = [executor.submit(self._filter_pack, pack) for pack in packs]
+                for future in futures:
+                    filtered.update(future.result())
+
+        for section, items in sections_items.items():
+            print(f"     ✓ [{section}] Pass 1 过滤: {len(filtered.get(section, []))}/{len(items)}")
+
+        return filtered
+
+    def _filter_pack(self, pack: Dict[str, List[Item]]) -> Dict[str, List[Item]]:
+        """过滤一个 section 包，失败时保留该包所有 items"""
+        if len(pack) == 1:
+            section, items = next(iter(pack.items()))
+            return {section: self._pass1_filter(items, section)}
+
+        prompt = PromptTemplates.filter_multi_user(pack, self.language)
+        try:
+            with self._api_slots:
+                selected = self.claude.call_with_json(
+                    prompt=prompt,
+                    system_blocks=self.claude.cache_blocks(
+                        PromptTemplates.filter_multi_system(self.language)
+                    ),
+                    max_tokens=self._filter_max_tokens(sum(map(len, pack.values())), len(pack)),
+                    temperature=0.2,
+                    model_override=self.pass1_model,
+                    allow_truncated=False,
+                )
+            return self._select_from_pack(selected, pack)
+        except Exception as e:
+            print(f"     ⚠️  Pass 1 批量过滤失败: {e}")
+            return dict(pack)
+
+    def _select_from_pack(self, selected, pack: Dict[str, List[Item]]) -> Dict[str, List[Item]]:
+        """按批量过滤返回的 {section: [ID...]} 提取各 section 的 items"""
+        if not isinstance(selected, dict):
+            raise ValueError(f"unexpected response type: {type(selected).__name__}")
+
+        result = {}
+        for section, items in pack.items():
+            if section not in selected:
+                # 漏答的 section 视同失败，保留全部
+                result[section] = items
+                continue
+            result[section] = [
+                items[item_id]
+                for item_id in self._parse_section_ids(selected[section] or [])
+                if 0 <= item_id < len(items)
+            ]
+        return result
+
+    def _filter_packs_via_batch(self, packs: List[Dict[str, List[Item]]]):
+        """
+        Pass 1 (Message Batches): 所有 section 包一次性提交
+
+        Returns:
+            过滤后的 {section: items}；整个 batch 失败时返回 None（回退到逐次调用）
+        """
+        requests = []
+        # custom_id -> (section, batch) 或 (None, pack)
+        targets = {}
+
+        for pack_idx, pack in enumerate(packs):
+            if len(pack) > 1:
+                custom_id = f"p1-{pack_idx}"
+                requests.append(self.claude.batch_request(
+                    custom_id,
+                    prompt=PromptTemplates.filter_multi_user(pack, self.language),
+                    system_blocks=self.claude.cache_blocks(
+                        PromptTemplates.filter_multi_system(self.language)
+                    ),
+                    max_tokens=self._filter_max_tokens(sum(map(len, pack.values())), len(pack)),
+                    temperature=0.2,
+                    model_override=self.pass1_model,
+                ))
+                targets[custom_id] = (None, pack)
+                continue
+
+            section, items = next(iter(pack.items()))
+            batches = self.claude.batch_items_by_tokens(items, max_tokens=80000)
+            for batch_idx, batch in enumerate(batches):
+                custom_id = f"p1-{pack_idx}-{batch_idx}"
+                requests.append(self.claude.batch_request(
+                    custom_id,
+                    prompt=PromptTemplates.filter_user(batch, self.language),
+                    system_blocks=self._filter_system_blocks(section),
+                    max_tokens=self._filter_max_tokens(len(batch)),
+                    temperature=0.2,
+                    model_override=self.pass1_model,
+                ))
+                targets[custom_id] = (section, batch)
+
+        if not requests:
+            return {}
+
+        try:
+            # 被截断的 ID 列表按失败处理（保留整批）
+            responses = self.claude.batch_call(requests, allow_truncated=False)
+        except Exception as e:
+            print(f"     ⚠️  Pass 1 Message Batch 失败，回退到逐次调用: {e}")
+            return None
+
+        filtered = {}
+        for custom_id, (section, target) in targets.items():
+            response = responses.get(custom_id)
+            if section is None:
+                try:
+                    if response is None:
+                        raise ValueError("batch 请求未成功")
+                    filtered.update(self._select_from_pack(self.claude.parse_json(response), target))
+                except Exception as e:
+                    print(f"     ⚠️  Pass 1 批量过滤失败: {e}")
+                    filtered.update(target)
+                continue
+
+            # 失败时保留所有items
+            selected = target if response is None else self._select_by_ids(response, target)
+            filtered.setdefault(section, []).extend(selected)
+
+        return filtered
+
+    @staticmethod
+    def _parse_section_ids(raw_ids: list) -> List[int]:
+        """解析批量过滤返回的 ID，兼容 3 / "3" / "news:3" 三种写法"""
+        ids = []
+        for raw in raw_ids:
+            if isinstance(raw, int):
+                ids.append(raw)
+                continue
+            tail = str(raw).rsplit(':', 1)[-1].strip()
+            if tail.isdigit():
+                ids.append(int(tail))
+        return ids
+
     def _pass2_extract(self, items: List[Item], section: str) -> List[Dict]:
         """
         Pass 2: 结构化提取（v0.2.0 增强版）
@@ -209,80 +560,225 @@ class AIAnalyzer:
         papers section 使用专用 prompt，额外提取 authors/arxiv_id/research_tags/practicality_score
         """
         is_papers = section == 'papers'
+        system_blocks = self._extract_system_blocks(section)
 
-        # 如果内容太多，分批处理
-        batches = self.claude.batch_items_by_tokens(items, max_tokens=80000)
+        # 命中缓存的 item 直接复用 brief，只把未命中的送给 Claude
+        all_briefs, items, cache_keys = self._pass2_cache_lookup(items, section)
+        if not items:
+            return all_briefs
 
-        all_briefs = []
+        # 如果内容太多，分批处理；高分 item 排在前面先送 Claude
+        items = sorted(items, key=lambda x: x.score, reverse=True)
+        batches = self.claude.batch_items_by_tokens(items, max_tokens=80000)
 
         for batch_idx, batch in enumerate(batches):
+            if batch_idx and self._enough_high_importance(all_briefs):
+                skipped = sum(len(b) for b in batches[batch_idx:])
+                print(f"     ⏭️  [{section}] 高分 brief 已足够，跳过剩余 {skipped} 条")
+                break
+
             if len(batches) > 1:
                 print(f"     📦 批次 {batch_idx + 1}/{len(batches)}: {len(batch)} 条")
 
             # 生成 prompt — papers section 使用专用 prompt
-            if is_papers:
-                prompt = PromptTemplates.extract_prompt_papers(batch, section, self.language)
-            else:
-                prompt = PromptTemplates.extract_prompt(batch, section, self.language)
+            prompt = PromptTemplates.extract_user(batch, self.language, is_papers)
 
-            # 调用 Claude（JSON 输出）
+            # 调用 Claude（流式 JSON 输出，每条 brief 闭合即处理）
             try:
-                briefs = self.claude.call_with_json(
-                    prompt=prompt,
-                    max_tokens=8192,
-                    temperature=0.3
-                )
-
-                # 验证格式
                 brief_list = []
-                if isinstance(briefs, list):
-                    brief_list = briefs
-                elif isinstance(briefs, dict) and 'items' in briefs:
-                    brief_list = briefs['items']
-
-                for brief in brief_list:
-                    # 通用字段默认值
-                    brief.setdefault('importance', 3)
-                    brief.setdefault('category_tags', [])
-                    brief.setdefault('insight', '')
-                    # papers 专用字段默认值
-                    if is_papers:
-                        brief.setdefault('authors', '')
-                        brief.setdefault('arxiv_id', '')
-                        brief.setdefault('research_tags', [])
-                        brief.setdefault('practicality_score', 3)
-
+                with self._api_slots:
+                    for brief in self.claude.stream_call_with_json(
+                        prompt=prompt,
+                        system_blocks=system_blocks,
+                        max_tokens=8192,
+                        temperature=0.3,
+                        model_override=self.pass2_model,
+                    ):
+                        # 验证格式
+                        if isinstance(brief, dict):
+                            brief_list.append(self._normalize_brief(brief, is_papers))
+
+                self._tag_briefs(brief_list, batch)
                 all_briefs.extend(brief_list)
+                self._cache_briefs(brief_list, cache_keys)
 
             except Exception as e:
                 print(f"     ⚠️  Pass 2 失败: {e}")
-                # 失败时使用简单格式，papers 额外从 metadata 回填字段
-                for item in batch:
-                    meta = getattr(item, 'metadata', {}) or {}
-                    display_source = meta.get('feed_name') or meta.get('feed_title') or item.source
-                    fallback = {
-                        'headline': item.title,
-                        'detail': item.text[:200],
-                        'url': item.url,
-                        'source': display_source,
-                        'importance': 3,
-                        'category_tags': [],
-                        'insight': ''
-                    }
-                    if is_papers:
-                        # 从 Item metadata 回填论文专用字段
-                        authors = meta.get('authors', [])
-                        author_str = ', '.join(authors[:3])
-                        if len(authors) > 3:
-                            author_str += ' et al.'
-                        fallback['authors'] = author_str
-                        fallback['arxiv_id'] = meta.get('arxiv_id', '')
-                        fallback['research_tags'] = meta.get('categories', [])[:4]
-                        fallback['practicality_score'] = 3
-                    all_briefs.append(fallback)
+                all_briefs.extend(self._fallback_briefs(batch, is_papers))
 
         return all_briefs
 
+    def _enough_high_importance(self, briefs: List[Dict]) -> bool:
+        target = self.target_high_importance
+        return target > 0 and sum(1 for b in briefs if b.get('importance', 3) >= 4) >= target
+
+    def _pass2_extract_via_batch(self, by_section: Dict[str, List[Item]]):
+        """
+        Pass 2 (Message Batches): 所有 section 的所有批次一次性提交
+
+        Returns:
+            {section: briefs}；整个 batch 失败时返回 None（回退到逐 section 调用）
+        """
+        results = {}
+        requests = []
+        # custom_id -> (section, batch)
+        targets = {}
+        # section -> {item.id: 缓存 key}
+        section_cache_keys = {}
+
+        for section_idx, (section, items) in enumerate(by_section.items()):
+            if not items:
+                continue
+            is_papers = section == 'papers'
+            cached, misses, section_cache_keys[section] = self._pass2_cache_lookup(items, section)
+            if cached:
+                results[section] = cached
+
+            for batch_idx, batch in enumerate(self.claude.batch_items_by_tokens(misses, max_tokens=80000)):
+                custom_id = f"p2-{section_idx}-{batch_idx}"
+                requests.append(self.claude.batch_request(
+                    custom_id,
+                    prompt=PromptTemplates.extract_user(batch, self.language, is_papers),
+                    system_blocks=self._extract_system_blocks(section),
+                    max_tokens=8192,
+                    temperature=0.3,
+                    model_override=self.pass2_model,
+                ))
+                targets[custom_id] = (section, batch)
+
+        if requests:
+            try:
+                responses = self.claude.batch_call(requests)
+            except Exception as e:
+                print(f"     ⚠️  Pass 2 Message Batch 失败，回退到逐次调用: {e}")
+                return None
+
+            for custom_id, (section, batch) in targets.items():
+                is_papers = section == 'papers'
+                response = responses.get(custom_id)
+                brief_list = []
+                if response is not None:
+                    brief_list = [
+                        self._normalize_brief(brief, is_papers)
+                        for brief in self.claude.json_elements(self.claude.parse_json(response))
+                        if isinstance(brief, dict)
+                    ]
+                if brief_list:
+                    self._tag_briefs(brief_list, batch)
+                    self._cache_briefs(brief_list, section_cache_keys[section])
+                else:
+                    print(f"     ⚠️  [{section}] Pass 2 批次失败，使用原始内容")
+                    brief_list = self._fallback_briefs(batch, is_papers)
+                results.setdefault(section, []).extend(brief_list)
+
+        for section, briefs in results.items():
+            print(f"     ✓ [{section}] 提取: {len(briefs)} 条 briefs")
+        return {section: briefs for section, briefs in results.items() if briefs}
+
+    def _extract_system_blocks(self, section: str) -> list:
+        return self.claude.cache_blocks(
+            PromptTemplates.extract_system(section, self.language, section == 'papers')
+        )
+
+    def _pass2_cache_lookup(self, items: List[Item], section: str):
+        """
+        查 brief 缓存
+
+        Returns:
+            (命中的 briefs, 未命中的 items, {item.id: 缓存 key})
+        """
+        if self.brief_cache is None:
+            return [], items, {}
+
+        model = self.pass2_model or self.claude.model
+        cached_briefs = []
+        misses = []
+        cache_keys = {}
+        for item in items:
+            key = BriefCache.make_key(item, section, self.language, model, PROMPT_VERSION)
+            cached = self.brief_cache.get(key)
+            if cached is not None:
+                cached['item_id'] = item.id
+                cached_briefs.append(cached)
+            else:
+                misses.append(item)
+                cache_keys[item.id] = key
+        if cached_briefs:
+            print(f"     💾 [{section}] Brief 缓存命中: {len(cached_briefs)}/{len(items)}")
+        return cached_briefs, misses, cache_keys
+
+    def _cache_briefs(self, brief_list: List[Dict], cache_keys: Dict[str, str]):
+        if not cache_keys:
+            return
+        for brief in brief_list:
+            key = cache_keys.get(brief.get('item_id'))
+            if key:
+                self.brief_cache.set(key, {k: v for k, v in brief.items() if k != 'item_id'})
+
+    @staticmethod
+    def _tag_briefs(brief_list: List[Dict], batch: List[Item]):
+        """
+        按 URL 把 Claude 返回的 brief 关联回本批次的 item，写入 brief['item_id']
+
+        后续的 fan-out / 缓存都按 item_id 匹配；空 URL 不参与匹配，
+        同一批次内 URL 相同的多个 item 按顺序各认领一条 brief。
+        """
+        by_url = defaultdict(list)
+        for item in batch:
+            key = canonical_url(item.url) if item.url else ''
+            if key:
+                by_url[key].append(item)
+        for brief in brief_list:
+            url = brief.get('url') or ''
+            candidates = by_url.get(canonical_url(url)) if url.strip() else None
+            if candidates:
+                brief['item_id'] = candidates.pop(0).id
+
+    @staticmethod
+    def _normalize_brief(brief: Dict, is_papers: bool) -> Dict:
+        """补齐 brief 的字段默认值"""
+        # 通用字段默认值
+        brief.setdefault('importance', 3)
+        brief.setdefault('category_tags', [])
+        brief.setdefault('insight', '')
+        # papers 专用字段默认值
+        if is_papers:
+            brief.setdefault('authors', '')
+            brief.setdefault('arxiv_id', '')
+            brief.setdefault('research_tags', [])
+            brief.setdefault('practicality_score', 3)
+        return brief
+
+    @staticmethod
+    def _fallback_briefs(batch: List[Item], is_papers: bool) -> List[Dict]:
+        """Pass 2 失败时使用简单格式，papers 额外从 metadata 回填字段"""
+        fallbacks = []
+        for item in batch:
+            meta = getattr(item, 'metadata', {}) or {}
+            display_source = meta.get('feed_name') or meta.get('feed_title') or item.source
+            fallback = {
+                'item_id': item.id,
+                'headline': item.title,
+                'detail': item.text[:200],
+                'url': item.url,
+                'source': display_source,
+                'importance': 3,
+                'category_tags': [],
+                'insight': ''
+            }
+            if is_papers:
+                # 从 Item metadata 回填论文专用字段
+                authors = meta.get('authors', [])
+                author_str = ', '.join(authors[:3])
+                if len(authors) > 3:
+                    author_str += ' et al.'
+                fallback['authors'] = author_str
+                fallback['arxiv_id'] = meta.get('arxiv_id', '')
+                fallback['research_tags'] = meta.get('categories', [])[:4]
+                fallback['practicality_score'] = 3
+            fallbacks.append(fallback)
+        return fallbacks
+
     # ============================================================
     # 个人关注板块 — 从全局高分内容中二次筛选
     # ============================================================
@@ -307,6 +803,10 @@ class AIAnalyzer:
         "cursor", "copilot", "aider", "coding assistant",
         "openai api", "claude api", "anthropic api",
     ]
+    # 所有关键词编译为一个交替正则；长词优先，quant / quantitative 这类前缀词只计一次
+    _PERSONAL_RE = re.compile(
+        "|".join(re.escape(kw.lower()) for kw in sorted(PERSONAL_KEYWORDS, key=len, reverse=True))
+    )
 
     def _build_personal_section(self, results: Dict[str, List[Dict]]) -> List[Dict]:
         """
@@ -317,61 +817,50 @@ class AIAnalyzer:
         2. 关键词匹配（headline + detail + tags 中命中个人兴趣关键词）
         3. 按 importance 降序，取 top 8
         """
-        import re
-
-        candidates = []
-
-        for section, briefs in results.items():
-            if section.startswith('__') or not isinstance(briefs, list):
-                continue
-            for brief in briefs:
-                importance = brief.get('importance', 3)
-                if importance < 3:
-                    continue
-
-                # 拼接检索文本
-                search_text = " ".join([
-                    brief.get('headline', ''),
-                    brief.get('detail', ''),
-                    " ".join(brief.get('category_tags', [])),
-                    brief.get('insight', ''),
-                ]).lower()
-
-                # 关键词匹配
-                match_count = 0
-                for kw in self.PERSONAL_KEYWORDS:
-                    if kw.lower() in search_text:
-                        match_count += 1
-
-                if match_count > 0:
-                    candidates.append({
-                        **brief,
-                        '_match_count': match_count,
-                        '_source_section': section,
-                    })
-
-        # 按匹配数 × importance 排序
-        candidates.sort(
-            key=lambda x: x['_match_count'] * x.get('importance', 3),
-            reverse=True
-        )
-
-        # 取 top 8，去掉内部字段
-        personal = []
-        seen_urls = set()
-        for c in candidates:
-            url = c.get('url', '')
-            if url in seen_urls:
-                continue
-            seen_urls.add(url)
-
-            # 去除内部字段
-            item = {k: v for k, v in c.items() if not k.startswith('_')}
-            personal.append(item)
-            if len(personal) >= 8:
-                break
+        # 先收集所有候选 brief，再一次性批量打分
+        eligible = [
+            brief
+            for section, briefs in results.items()
+            if not section.startswith('__') and isinstance(briefs, list)
+            for brief in briefs
+            if brief.get('importance', 3) >= 3
+        ]
+        if not eligible:
+            return []
 
-        return personal
+        # 拼接检索文本
+        texts = [
+            " ".join([
+                brief.get('headline', ''),
+                brief.get('detail', ''),
+                " ".join(brief.get('category_tags', [])),
+                brief.get('insight', ''),
+            ]).lower()
+            for brief in eligible
+        ]
+
+        # 关键词匹配：命中的不同关键词数（map 走 C 层循环）
+        match_counts = [len(set(hits)) for hits in map(self._PERSONAL_RE.findall, texts)]
+
+        # (匹配数 × importance, brief)，不复制 brief
+        candidates = [
+            (mc * brief.get('importance', 3), brief)
+            for mc, brief in zip(match_counts, eligible)
+            if mc > 0
+        ]
+
+        # 同一 URL 只保留得分最高的一条
+        best_by_url = {}
+        for score, brief in candidates:
+            url = brief.get('url', '')
+            if url not in best_by_url or score > best_by_url[url][0]:
+                best_by_url[url] = (score, brief)
+
+        # 取 top 8，只复制最终入选的 brief
+        return [
+            dict(brief)
+            for _, brief in heapq.nlargest(8, best_by_url.values(), key=lambda t: t[0])
+        ]
 
     def _generate_executive_summary(self, briefs: Dict[str, List[Dict]],
                                      section_configs: dict) -> str:
@@ -395,11 +884,17 @@ class AIAnalyzer:
             content_briefs, section_configs, self.language
         )
 
-        response = self.claude.call(
-            prompt=prompt,
-            max_tokens=1000,
-            temperature=0.4
-        )
+        summary_model = self.pass2_model
+        if len(content_briefs) <= self.SHORT_SUMMARY_SECTIONS:
+            summary_model = self.pass1_model
+
+        with self._api_slots:
+            response = self.claude.call(
+                prompt=prompt,
+                max_tokens=1000,
+                temperature=0.4,
+                model_override=summary_model,
+            )
 
         return response.strip()
 
@@ -416,24 +911,27 @@ class AIAnalyzer:
             return []
 
         # 提取数字
-        import re
-        numbers = re.findall(r'\d+', response)
+        numbers = _ID_RE.findall(response)
 
         try:
             return [int(n) for n in numbers]
         except ValueError:
             return []
 
+    def close(self):
+        """关闭 Brief 缓存连接（线程池都在 analyze 内创建和关闭，这里无需处理）"""
+        if self.brief_cache is not None:
+            self.brief_cache.close()
+            self.brief_cache = None
+
     def save_analyzed_data(self, briefs: Dict[str, List[Dict]], output_path: Path):
-        """保存分析结果到 JSON"""
+        """保存分析结果到 JSON（orjson 可用时使用，单次写入）"""
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(briefs, f, indent=2, ensure_ascii=False)
+        write_json(output_path, briefs)
 
         print(f"💾 已保存分析数据: {output_path}")
 
     def load_analyzed_data(self, input_path: Path) -> Dict[str, List[Dict]]:
         """从 JSON 加载分析结果"""
-        with open(input_path, encoding='utf-8') as f:
-            return json.load(f)
+        return read_json(input_path)
@@ -7,15 +7,29 @@
 4. Token-aware 分批 + 容错
 """
 
-import json
-from typing import List, Dict, Optional
+import dataclasses
+import heapq
+import itertools
+import random
+import threading
+import time
+import yaml
+from typing import Any, Callable, List, Dict, Optional
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from sources.base import Item
-from ai.claude import ClaudeClient
-from ai.prompts_v2 import PromptsV2
+from ai.claude import ClaudeClient, RateLimitError
+from ai.prompts_v2 import PromptsV2, PROMPT_VERSION
+from utils.json_utils import write_json, read_json
+from utils.response_cache import ResponseCache
+from utils.time_utils import PipelineTimeout
+
+
+# 跨运行响应缓存的默认位置
+DEFAULT_RESPONSE_CACHE = Path(__file__).parent.parent.parent / "data" / "cache" / "claude_responses.sqlite"
+SECTIONS_CONFIG_PATH = Path(__file__).parent.parent.parent / "config" / "sections.yaml"
 
 
 class AIAnalyzerV2:
@@ -33,6 +47,52 @@ class AIAnalyzerV2:
         self.config = config or {}
         self.prompts = PromptsV2()
         self.max_workers = max_workers
+        # 限制同时在途的 Claude 调用数；429 时在此之外做带抖动的指数退避
+        self._call_slots = threading.Semaphore(max_workers)
+        self._retries = Counter()  # section -> 429 重试次数
+        self._retries_lock = threading.Lock()
+        # section 级并行复用同一个线程池，长驻服务里多次 analyze 不再反复建线程
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analyzer")
+        # section 内多批次另用一个池（在 section 线程里提交，不能与外层共用以免互相等待）；
+        # 总并发仍由 _call_slots 限制
+        self._batch_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analyzer-batch")
+        # 精排是结构化打分，默认用 Haiku；洞察 / summary 沿用 ClaudeClient 的默认模型。
+        # openai_responses 代理未必提供 Haiku，只在官方协议下默认切换
+        default_fine_rank = (
+            self.DEFAULT_FINE_RANK_MODEL
+            if getattr(claude_client, "protocol", "anthropic") == "anthropic" else None
+        )
+        self.fine_rank_model = self.config.get("fine_rank_model", default_fine_rank) or None
+        # Executive Summary 用到的 section 配置，只读一次
+        self._section_configs = self._load_section_configs()
+        # 非交互运行（interactive: false）时精排 / 洞察提取走 Message Batches API
+        self.use_batch_api = (
+            not self.config.get("interactive", True)
+            and getattr(claude_client, "protocol", "anthropic") == "anthropic"
+        )
+
+        # 精排 / 洞察的 JSON 响应跨运行缓存（重跑同一天时不再调用 Claude）
+        self.response_cache = None
+        if self.config.get("response_cache", True):
+            try:
+                self.response_cache = ResponseCache(
+                    self.config.get("response_cache_path", DEFAULT_RESPONSE_CACHE)
+                )
+            except Exception as e:
+                print(f"⚠️  响应缓存不可用: {e}")
+
+    # 精排默认模型（低成本 / 低延迟）
+    DEFAULT_FINE_RANK_MODEL = "claude-haiku-4-5"
+    # 采样温度达到该值时结果本就不要求可复现，不走响应缓存
+    CACHE_MAX_TEMPERATURE = 0.7
+    # 单次精排 / 洞察调用遇到 429 时的最大尝试次数
+    RATE_LIMIT_ATTEMPTS = 3
+    # 每条 item 正文的默认字符上限：prompt 里最多只用到前 600 字（精排）
+    MAX_ITEM_CHARS = 600
+    # 合并精排只收小 section；每包条数按输出预算限制：每条精排结果（含 reason）
+    # 约 100 output tokens，8192 max_tokens 下留出余量
+    PACK_SECTION_MAX_ITEMS = 10
+    PACK_MAX_ITEMS = 40
 
     def analyze(self, items: List[Item], top_per_section: int = 10) -> Dict:
         """
@@ -51,95 +111,34 @@ class AIAnalyzerV2:
         """
         print(f"\n🧠 AI 分析 v2 启动...")
         print(f"   模型: {self.claude.model}")
+        print(f"   精排模型: {self.fine_rank_model or self.claude.model}")
 
-        # 按 section 分组
-        by_section = self._group_by_section(items)
+        # 按 section 分组；正文先截到 prompt 实际用到的长度，分批估算才不会虚高
+        by_section = self._group_by_section(self._truncate_items(items))
 
         all_briefs = {}
-        stats = {"sections": {}, "total_input": len(items), "total_output": 0}
-
-        def _process_section(section: str) -> Optional[tuple]:
-            """处理单个 section 的精排 + 洞察提取，返回 (section, briefs, stat_dict) 或 None"""
-            section_items = by_section[section]
-            print(f"\n  📁 处理 '{section}': {len(section_items)} 条候选")
-
-            # 限制每个 section 的输入量（降低到 20 以加速）
-            max_input = self.config.get("max_items_per_section", 20)
-            if len(section_items) > max_input:
-                section_items = sorted(section_items, key=lambda x: x.score, reverse=True)[:max_input]
-                print(f"     📊 截取 Top {max_input}")
-
-            # Step 1: 精排
-            ranked_ids = self._fine_rank(section_items, section)
-
-            if ranked_ids:
-                # 按精排结果重排
-                id_to_item = {i: item for i, item in enumerate(section_items)}
-                ranked_items = []
-                for r in ranked_ids:
-                    idx = r.get("id", -1)
-                    if idx in id_to_item:
-                        item = id_to_item[idx]
-                        # 附加精排信息
-                        item.metadata = item.metadata or {}
-                        item.metadata["fine_rank"] = {
-                            "relevance": r.get("relevance", 0),
-                            "impact": r.get("impact", 0),
-                            "urgency": r.get("urgency", 0),
-                            "total": r.get("total", 0),
-                            "priority": r.get("priority", "🟢"),
-                        }
-                        ranked_items.append(item)
-
-                # 取 top N
-                ranked_items = ranked_items[:top_per_section]
-                print(f"     ✓ 精排: {len(ranked_items)} 条通过")
-            else:
-                # 精排失败，fallback 到粗排
-                ranked_items = section_items[:top_per_section]
-                print(f"     ⚠️ 精排失败，使用粗排 Top {top_per_section}")
-
-            # Step 2: 洞察提取
-            if ranked_items:
-                briefs = self._extract_insights(ranked_items, section)
-                
-                # 注入精排的 priority（如果 AI 没给的话）
-                for i, brief in enumerate(briefs):
-                    if i < len(ranked_items):
-                        meta = ranked_items[i].metadata or {}
-                        fr = meta.get("fine_rank", {})
-                        if "priority" not in brief and fr.get("priority"):
-                            brief["priority"] = fr["priority"]
-
-                section_stat = {
-                    "input": len(by_section[section]),
-                    "after_fine_rank": len(ranked_items),
-                    "output": len(briefs),
-                }
-                print(f"     ✓ 洞察: {len(briefs)} 条 briefs")
-                return (section, briefs, section_stat)
+        stats = {
+            "sections": {},
+            "total_input": len(items),
+            "total_output": 0,
+            "models": {
+                "fine_rank": self.fine_rank_model or self.claude.model,
+                "insight": self.claude.model,
+            },
+        }
+        self._retries.clear()
 
-            return None
+        section_results = None
+        if self.use_batch_api:
+            section_results = self._analyze_sections_via_batch(by_section, top_per_section)
+        if section_results is None:
+            section_results = self._analyze_sections_parallel(by_section, top_per_section)
 
-        # 并行处理各 section（每 section 最多 180s）
-        section_timeout = 180
-        sections = sorted(by_section.keys())
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_section = {
-                executor.submit(_process_section, section): section
-                for section in sections
-            }
-            for future in as_completed(future_to_section):
-                section = future_to_section[future]
-                try:
-                    result = future.result(timeout=section_timeout)
-                    if result is not None:
-                        sec_name, briefs, section_stat = result
-                        all_briefs[sec_name] = briefs
-                        stats["sections"][sec_name] = section_stat
-                        stats["total_output"] += len(briefs)
-                except Exception as e:
-                    print(f"     ⚠️ Section '{section}' 处理异常: {e}")
+        for sec_name, briefs, section_stat in section_results:
+            all_briefs[sec_name] = briefs
+            section_stat["retries"] = self._retries[sec_name]
+            stats["sections"][sec_name] = section_stat
+            stats["total_output"] += len(briefs)
 
         # Step 3: Executive Summary + 跨板块关联分析
         executive_summary = ""
@@ -158,11 +157,256 @@ class AIAnalyzerV2:
         }
 
     def _group_by_section(self, items: List[Item]) -> Dict[str, List[Item]]:
-        """按 section/channel 分组"""
-        groups = defaultdict(list)
+        """按 section/channel 分组（单遍，命中已有分组时不分配新 list）"""
+        groups = {}
         for item in items:
-            groups[item.channel].append(item)
-        return dict(groups)
+            bucket = groups.get(item.channel)
+            if bucket is None:
+                groups[item.channel] = bucket = []
+            bucket.append(item)
+        return groups
+
+    def _truncate_items(self, items: List[Item]) -> List[Item]:
+        """正文超过 max_item_chars 的 item 换成截断后的副本（不改动调用方的对象）"""
+        max_chars = self.config.get("max_item_chars", self.MAX_ITEM_CHARS)
+        return [
+            dataclasses.replace(item, text=item.text[:max_chars])
+            if item.text and len(item.text) > max_chars else item
+            for item in items
+        ]
+
+    def _analyze_sections_parallel(self, by_section: Dict[str, List[Item]],
+                                   top_per_section: int) -> List[tuple]:
+        """逐 section 并行精排 + 洞察提取，返回 [(section, briefs, stat_dict)]"""
+        limited = {
+            section: self._limit_section_items(section, section_items)
+            for section, section_items in by_section.items()
+        }
+        # 小 section 合并精排，与各 section 线程同时进行；被打包的 section 在线程里等所在包的结果，
+        # 未覆盖（或包解析失败）的 section 单独精排
+        pack_futures = {}
+        for pack in self._fine_rank_packs(limited):
+            future = self._batch_executor.submit(self._fine_rank_pack, pack)
+            pack_futures.update(dict.fromkeys(pack, future))
+
+        def _process_section(section: str) -> Optional[tuple]:
+            """处理单个 section 的精排 + 洞察提取，返回 (section, briefs, stat_dict) 或 None"""
+            section_items = limited[section]
+
+            # Step 1: 精排
+            pack_future = pack_futures.get(section)
+            ranked_ids = pack_future.result().get(section) if pack_future is not None else None
+            if ranked_ids is None:
+                ranked_ids = self._fine_rank(section_items, section)
+            ranked_items = self._apply_fine_rank(section, section_items, ranked_ids, top_per_section)
+
+            # Step 2: 洞察提取
+            if ranked_items:
+                briefs = self._extract_insights(ranked_items, section)
+                return self._finish_section(section, by_section[section], ranked_items, briefs)
+
+            return None
+
+        # 并行处理各 section（每 section 最多 180s）
+        results = []
+        section_timeout = 180
+        sections = sorted(by_section.keys())
+        future_to_section = {
+            self._executor.submit(_process_section, section): section
+            for section in sections
+        }
+        for future in as_completed(future_to_section):
+            section = future_to_section[future]
+            try:
+                result = future.result(timeout=section_timeout)
+                if result is not None:
+                    results.append(result)
+            except Exception as e:
+                print(f"     ⚠️ Section '{section}' 处理异常: {e}")
+
+        return results
+
+    def _analyze_sections_via_batch(self, by_section: Dict[str, List[Item]],
+                                    top_per_section: int) -> Optional[List[tuple]]:
+        """
+        用 Message Batches API 处理所有 section：精排一个 batch，洞察提取一个 batch
+
+        custom_id 只允许 [a-zA-Z0-9_-]，用 section 序号而不是 section 名。
+        整个 batch 失败时返回 None（回退到逐 section 调用）。
+        """
+        sections = sorted(by_section.keys())
+        limited = {
+            section: self._limit_section_items(section, by_section[section])
+            for section in sections
+        }
+
+        # Step 1: 精排 —— 所有 section × 批次一次提交（命中响应缓存的不提交）
+        requests = []
+        rank_targets = {}
+        ranked_by_section = defaultdict(list)
+        for sec_idx, section in enumerate(sections):
+            offset = 0
+            for batch_idx, batch in enumerate(
+                self.claude.batch_items_by_tokens(limited[section], max_tokens=60000)
+            ):
+                prompt = self.prompts.fine_rank_user(batch)
+                system = self.prompts.fine_rank_system(section)
+                key, cached = self._cached_response(prompt, system, 4096, 0.2, self.fine_rank_model)
+                if cached is not None:
+                    ranked_by_section[section].extend(self._offset_ranked(cached, offset))
+                else:
+                    custom_id = f"fr-{sec_idx}-{batch_idx}"
+                    requests.append(self.claude.batch_request(
+                        custom_id,
+                        prompt=prompt,
+                        system_blocks=self.claude.cache_blocks(system),
+                        max_tokens=4096,
+                        temperature=0.2,
+                        model_override=self.fine_rank_model,
+                    ))
+                    rank_targets[custom_id] = (section, offset, key)
+                offset += len(batch)
+
+        try:
+            responses = self.claude.batch_call(requests) if requests else {}
+        except PipelineTimeout:
+            # 全局超时：没有剩余时间再逐次调用，直接终止
+            raise
+        except Exception as e:
+            print(f"     ⚠️ 精排 Message Batch 失败，回退到逐次调用: {e}")
+            return None
+
+        for custom_id, (section, offset, key) in rank_targets.items():
+            response = responses.get(custom_id)
+            if response is None:
+                print(f"     ⚠️ [{section}] 精排批次失败")
+                continue
+            result = self.claude.parse_json(response)
+            self._store_response(key, result)
+            ranked_by_section[section].extend(self._offset_ranked(result, offset))
+
+        ranked_items_by_section = {}
+        for section in sections:
+            ranked = sorted(ranked_by_section[section], key=lambda x: x.get("total", 0), reverse=True)
+            ranked_items_by_section[section] = self._apply_fine_rank(
+                section, limited[section], ranked, top_per_section
+            )
+
+        # Step 2: 洞察提取 —— 所有 section × 批次一次提交（命中响应缓存的不提交）
+        requests = []
+        insight_targets = {}
+        briefs_by_section = defaultdict(list)
+        for sec_idx, section in enumerate(sections):
+            for batch_idx, batch in enumerate(
+                self.claude.batch_items_by_tokens(ranked_items_by_section[section], max_tokens=60000)
+            ):
+                prompt = self.prompts.insight_extract_user(batch)
+                system = self.prompts.insight_extract_system(section)
+                key, cached = self._cached_response(prompt, system, 16384, 0.3)
+                if cached is not None:
+                    briefs_by_section[section].extend(self.claude.json_elements(cached))
+                    continue
+                custom_id = f"ie-{sec_idx}-{batch_idx}"
+                requests.append(self.claude.batch_request(
+                    custom_id,
+                    prompt=prompt,
+                    system_blocks=self.claude.cache_blocks(system),
+                    max_tokens=16384,
+                    temperature=0.3,
+                ))
+                insight_targets[custom_id] = (section, batch, key)
+
+        try:
+            responses = self.claude.batch_call(requests) if requests else {}
+        except PipelineTimeout:
+            raise
+        except Exception as e:
+            print(f"     ⚠️ 洞察 Message Batch 失败，回退到逐次调用: {e}")
+            return None
+
+        for custom_id, (section, batch, key) in insight_targets.items():
+            response = responses.get(custom_id)
+            if response is None:
+                print(f"     ⚠️ [{section}] 提取批次失败")
+                briefs_by_section[section].extend(self._fallback_briefs(batch))
+                continue
+            result = self.claude.parse_json(response)
+            self._store_response(key, result)
+            briefs_by_section[section].extend(self.claude.json_elements(result))
+
+        return [
+            self._finish_section(section, by_section[section], ranked_items_by_section[section],
+                                 briefs_by_section[section])
+            for section in sections
+            if ranked_items_by_section[section]
+        ]
+
+    def _limit_section_items(self, section: str, section_items: List[Item]) -> List[Item]:
+        """限制每个 section 的输入量（降低到 20 以加速）"""
+        print(f"\n  📁 处理 '{section}': {len(section_items)} 条候选")
+
+        max_input = self.config.get("max_items_per_section", 20)
+        if len(section_items) > max_input:
+            section_items = heapq.nlargest(max_input, section_items, key=lambda x: x.score)
+            print(f"     📊 截取 Top {max_input}")
+        return section_items
+
+    @staticmethod
+    def _apply_fine_rank(section: str, section_items: List[Item], ranked_ids: List[Dict],
+                         top_per_section: int) -> List[Item]:
+        """按精排结果重排并取 top N；精排失败时 fallback 到粗排"""
+        if not ranked_ids:
+            print(f"     ⚠️ [{section}] 精排失败，使用粗排 Top {top_per_section}")
+            return section_items[:top_per_section]
+
+        id_to_item = {i: item for i, item in enumerate(section_items)}
+        ranked_items = []
+        for r in ranked_ids:
+            idx = r.get("id", -1)
+            if idx in id_to_item:
+                item = id_to_item[idx]
+                # 附加精排信息
+                item.metadata = item.metadata or {}
+                item.metadata["fine_rank"] = {
+                    "relevance": r.get("relevance", 0),
+                    "impact": r.get("impact", 0),
+                    "urgency": r.get("urgency", 0),
+                    "total": r.get("total", 0),
+                    "priority": r.get("priority", "🟢"),
+                }
+                ranked_items.append(item)
+
+        # 取 top N
+        ranked_items = ranked_items[:top_per_section]
+        print(f"     ✓ [{section}] 精排: {len(ranked_items)} 条通过")
+        return ranked_items
+
+    @staticmethod
+    def _finish_section(section: str, raw_items: List[Item], ranked_items: List[Item],
+                        briefs: List[Dict]) -> tuple:
+        """注入精排的 priority 并生成 section 统计，返回 (section, briefs, stat_dict)"""
+        # 注入精排的 priority（如果 AI 没给的话）
+        for i, brief in enumerate(briefs):
+            if i < len(ranked_items):
+                meta = ranked_items[i].metadata or {}
+                fr = meta.get("fine_rank", {})
+                if "priority" not in brief and fr.get("priority"):
+                    brief["priority"] = fr["priority"]
+
+        # 带上原文域名（Item.domain 已缓存），下游 Deduplicator 不必再解析 URL
+        domains = {item.url: item.domain for item in ranked_items}
+        for brief in briefs:
+            domain = domains.get(brief.get("url"))
+            if domain is not None:
+                brief.setdefault("domain", domain)
+
+        section_stat = {
+            "input": len(raw_items),
+            "after_fine_rank": len(ranked_items),
+            "output": len(briefs),
+        }
+        print(f"     ✓ [{section}] 洞察: {len(briefs)} 条 briefs")
+        return (section, briefs, section_stat)
 
     def _fine_rank(self, items: List[Item], section: str) -> List[Dict]:
         """
@@ -171,95 +415,238 @@ class AIAnalyzerV2:
         Returns:
             排序后的 [{id, relevance, impact, urgency, total, priority, reason}]
         """
-        # 分批（防超 token）
+        # 分批（防超 token），各批次并行
         batches = self.claude.batch_items_by_tokens(items, max_tokens=60000)
-        all_ranked = []
+        # 每批首条在 items 中的下标，用于把批次内 ID 换算成 section 内 ID
+        offsets = list(itertools.accumulate((len(batch) for batch in batches[:-1]), initial=0))
 
-        for batch_idx, batch in enumerate(batches):
+        def _rank_batch(batch_idx: int) -> List[Dict]:
+            batch = batches[batch_idx]
             if len(batches) > 1:
                 print(f"     📦 精排批次 {batch_idx+1}/{len(batches)}: {len(batch)} 条")
 
-            prompt = self.prompts.fine_rank_prompt(batch, section)
-
             try:
-                result = self.claude.call_with_json(
-                    prompt=prompt,
-                    system=self.prompts.system_prompt(),
+                result = self._call_json(
+                    prompt=self.prompts.fine_rank_user(batch),
+                    system=self.prompts.fine_rank_system(section),
                     max_tokens=4096,
                     temperature=0.2,
+                    sections=(section,),
+                    model_override=self.fine_rank_model,
                 )
-
-                if isinstance(result, list):
-                    # 调整 ID offset（多批次时）
-                    offset = sum(len(batches[b]) for b in range(batch_idx)) if batch_idx > 0 else 0
-                    for r in result:
-                        r["id"] = r.get("id", 0) + offset
-                    all_ranked.extend(result)
-
+                return self._offset_ranked(result, offsets[batch_idx])
             except Exception as e:
                 print(f"     ⚠️ 精排失败: {e}")
+                return []
+
+        all_ranked = []
+        for ranked in self._map_batches(_rank_batch, len(batches)):
+            all_ranked.extend(ranked)
 
         # 按 total 降序
         all_ranked.sort(key=lambda x: x.get("total", 0), reverse=True)
         return all_ranked
 
+    def _fine_rank_packs(self, sections_items: Dict[str, List[Item]]) -> List[Dict[str, List[Item]]]:
+        """
+        多 section 合并精排的分包：只收小 section，按条数（即预期输出 token）和输入 token 贪心打包
+
+        只含一个 section 的包不返回（走 _fine_rank）。
+
+        Returns:
+            [{section: items}]，每包一次 Claude 调用（见 _fine_rank_pack）
+        """
+        max_tokens = 60000
+        packs = []
+        current_pack = {}
+        current_items = 0
+        current_tokens = 0
+
+        for section, items in sections_items.items():
+            if not items or len(items) > self.PACK_SECTION_MAX_ITEMS:
+                continue
+            section_tokens = sum(self.claude.estimate_item_tokens(item) for item in items)
+            if current_pack and (
+                current_items + len(items) > self.PACK_MAX_ITEMS
+                or current_tokens + section_tokens > max_tokens
+            ):
+                packs.append(current_pack)
+                current_pack = {}
+                current_items = 0
+                current_tokens = 0
+            current_pack[section] = items
+            current_items += len(items)
+            current_tokens += section_tokens
+
+        if current_pack:
+            packs.append(current_pack)
+
+        return [pack for pack in packs if len(pack) > 1]
+
+    def _fine_rank_pack(self, pack: Dict[str, List[Item]]) -> Dict[str, List[Dict]]:
+        """精排一个 section 包；解析失败或漏答的 section 不返回"""
+        print(f"     📦 合并精排: {', '.join(pack)}")
+        try:
+            result = self._call_json(
+                prompt=self.prompts.multi_section_fine_rank_user(pack),
+                system=self.prompts.multi_section_fine_rank_system(),
+                max_tokens=8192,
+                temperature=0.2,
+                sections=tuple(pack),
+                model_override=self.fine_rank_model,
+                validate=self._has_sections,
+            )
+            if not self._has_sections(result):
+                raise ValueError("missing 'sections'")
+            sections = result["sections"]
+        except Exception as e:
+            print(f"     ⚠️ 合并精排失败，逐 section 精排: {e}")
+            return {}
+
+        ranked = {}
+        for section in pack:
+            entries = sections.get(section)
+            if not isinstance(entries, list):
+                continue
+            ranked[section] = sorted(
+                (r for r in entries if isinstance(r, dict)),
+                key=lambda x: x.get("total", 0),
+                reverse=True,
+            )
+        return ranked
+
+    @staticmethod
+    def _has_sections(result) -> bool:
+        """合并精排响应是否为 {"sections": {...}}"""
+        return isinstance(result, dict) and isinstance(result.get("sections"), dict)
+
+    def _call_json(self, prompt: str, system: str, max_tokens: int, temperature: float,
+                   sections: tuple = (), model_override: Optional[str] = None,
+                   validate: Optional[Callable[[Any], bool]] = None):
+        """
+        call_with_json（system 走 prompt cache）+ 跨运行响应缓存
+
+        model_override: 本次调用的模型（精排用 fine_rank_model），默认 ClaudeClient 的模型
+        validate: 响应结构校验；不通过的响应照常返回，但不写入缓存（已缓存的也不复用）
+
+        并发受 max_workers 限制；遇到 429 只在这里做带抖动的指数退避（ClaudeClient 对 429
+        不重试、其他错误照常重试；退避时不占并发槽），重试次数记到 sections 名下（见 stats["sections"][sec]["retries"]）。
+        """
+        key, cached = self._cached_response(prompt, system, max_tokens, temperature, model_override)
+        if cached is not None and (validate is None or validate(cached)):
+            return cached
+
+        for attempt in range(self.RATE_LIMIT_ATTEMPTS):
+            try:
+                with self._call_slots:
+                    result = self.claude.call_with_json(
+                        prompt=prompt,
+                        system_blocks=self.claude.cache_blocks(system),
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        model_override=model_override,
+                        retry_rate_limit=False,
+                    )
+                break
+            except RateLimitError:
+                if attempt == self.RATE_LIMIT_ATTEMPTS - 1:
+                    raise
+                with self._retries_lock:
+                    self._retries.update(sections)
+                wait_time = min(60, 2 ** attempt + random.random())
+                print(f"     ⏳ Rate limit，{wait_time:.1f}s 后重试 ({attempt + 1}/{self.RATE_LIMIT_ATTEMPTS - 1})")
+                time.sleep(wait_time)
+
+        if validate is None or validate(result):
+            self._store_response(key, result)
+        return result
+
+    def _cached_response(self, prompt: str, system: str, max_tokens: int, temperature: float,
+                         model_override: Optional[str] = None):
+        """
+        查响应缓存
+
+        Returns:
+            (缓存 key, 缓存的响应)；不走缓存时 key 为 None，未命中时响应为 None
+        """
+        if self.response_cache is None or temperature >= self.CACHE_MAX_TEMPERATURE:
+            return None, None
+        key = ResponseCache.make_key(
+            model_override or self.claude.model, system, prompt, max_tokens, temperature, PROMPT_VERSION
+        )
+        return key, self.response_cache.get(key)
+
+    def _store_response(self, key: Optional[str], result):
+        # 空结果（解析失败）不缓存，下次重试
+        if key and result:
+            self.response_cache.set(key, result)
+
+    @staticmethod
+    def _offset_ranked(result, offset: int) -> List[Dict]:
+        """把批次内的精排 ID 换算成 section 内 ID"""
+        if not isinstance(result, list):
+            return []
+        for r in result:
+            r["id"] = r.get("id", 0) + offset
+        return result
+
     def _extract_insights(self, items: List[Item], section: str) -> List[Dict]:
         """
         洞察提取：生成 headline + detail + priority + tags
         """
         batches = self.claude.batch_items_by_tokens(items, max_tokens=60000)
-        all_briefs = []
 
-        for batch_idx, batch in enumerate(batches):
+        def _extract_batch(batch_idx: int) -> List[Dict]:
+            batch = batches[batch_idx]
             if len(batches) > 1:
                 print(f"     📦 提取批次 {batch_idx+1}/{len(batches)}: {len(batch)} 条")
 
-            prompt = self.prompts.insight_extract_prompt(batch, section)
-
             try:
-                briefs = self.claude.call_with_json(
-                    prompt=prompt,
-                    system=self.prompts.system_prompt(),
+                briefs = self._call_json(
+                    prompt=self.prompts.insight_extract_user(batch),
+                    system=self.prompts.insight_extract_system(section),
                     max_tokens=16384,
                     temperature=0.3,
+                    sections=(section,),
                 )
-
-                if isinstance(briefs, list):
-                    all_briefs.extend(briefs)
-                elif isinstance(briefs, dict) and "items" in briefs:
-                    all_briefs.extend(briefs["items"])
-
+                return self.claude.json_elements(briefs)
             except Exception as e:
                 print(f"     ⚠️ 提取失败: {e}")
-                # Fallback
-                for item in batch:
-                    meta = item.metadata or {}
-                    all_briefs.append({
-                        "headline": item.title,
-                        "detail": item.text[:200],
-                        "url": item.url,
-                        "source": meta.get("feed_name") or item.source,
-                        "priority": "🟢",
-                        "tags": [],
-                    })
+                return self._fallback_briefs(batch)
+
+        all_briefs = []
+        for briefs in self._map_batches(_extract_batch, len(batches)):
+            all_briefs.extend(briefs)
 
         return all_briefs
 
+    def _map_batches(self, fn, n_batches: int) -> List:
+        """对 0..n_batches-1 调用 fn，多批次时并行；结果保持批次顺序"""
+        if n_batches <= 1:
+            return [fn(i) for i in range(n_batches)]
+        return list(self._batch_executor.map(fn, range(n_batches)))
+
+    @staticmethod
+    def _fallback_briefs(batch: List[Item]) -> List[Dict]:
+        """提取失败时直接用原始内容"""
+        fallbacks = []
+        for item in batch:
+            meta = item.metadata or {}
+            fallbacks.append({
+                "headline": item.title,
+                "detail": item.text[:200],
+                "url": item.url,
+                "source": meta.get("feed_name") or item.source,
+                "priority": "🟢",
+                "tags": [],
+            })
+        return fallbacks
+
     def _generate_executive_summary(self, all_briefs: Dict) -> str:
         """
         生成跨板块 Executive Summary
         """
-        from processors.generator import ReportGenerator
-        # 加载 section configs
-        section_configs_path = Path(__file__).parent.parent.parent / "config" / "sections.yaml"
-        import yaml
-        section_configs = {}
-        if section_configs_path.exists():
-            with open(section_configs_path) as f:
-                data = yaml.safe_load(f)
-                section_configs = data.get("sections", {})
-
-        prompt = self.prompts.executive_summary_prompt(all_briefs, section_configs)
+        prompt = self.prompts.executive_summary_prompt(all_briefs, self._section_configs)
 
         try:
             summary = self.claude.call(
@@ -274,6 +661,15 @@ class AIAnalyzerV2:
             print(f"     ⚠️ Executive Summary 生成失败: {e}")
             return ""
 
+    @staticmethod
+    def _load_section_configs() -> Dict:
+        """加载 config/sections.yaml 的 sections 配置"""
+        if not SECTIONS_CONFIG_PATH.exists():
+            return {}
+        with open(SECTIONS_CONFIG_PATH) as f:
+            data = yaml.safe_load(f) or {}
+        return data.get("sections", {})
+
     def _generate_cross_analysis(self, all_briefs: Dict) -> Dict:
         """
         跨板块关联分析 — 找出不同 section 的隐性连接
@@ -302,14 +698,20 @@ class AIAnalyzerV2:
 
         return {}
 
+    def close(self):
+        """关闭线程池和响应缓存（实例不再可用）"""
+        self._executor.shutdown()
+        self._batch_executor.shutdown()
+        if self.response_cache is not None:
+            self.response_cache.close()
+            self.response_cache = None
+
     def save_analyzed_data(self, result: Dict, output_path: Path):
         """保存分析结果"""
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        write_json(output_path, result)
         print(f"💾 已保存分析数据: {output_path}")
 
     def load_analyzed_data(self, input_path: Path) -> Dict:
         """加载分析结果"""
-        with open(input_path, encoding="utf-8") as f:
-            return json.load(f)
+        return read_json(input_path)
@@ -2,9 +2,13 @@
 
 from typing import List, Dict, Tuple
 from difflib import SequenceMatcher
+from urllib.parse import urlparse
 import re
 
 
+_PUNCT_RE = re.compile(r'[^\w\s]')
+
+
 class Deduplicator:
     """
     基于标题相似度 + URL 域名的去重器
@@ -32,14 +36,29 @@ class Deduplicator:
         # 按 importance 降序，高分优先保留
         sorted_briefs = sorted(briefs, key=lambda x: x.get('importance', 3), reverse=True)
         
-        clusters = []  # List of (representative_brief, [related_briefs])
+        # 任一阈值都过不了的 pair 不用算完整 ratio
+        min_threshold = min(self.title_threshold, self.strict_threshold)
+        
+        # List of (representative_brief, [related_briefs], 以代表标题为 seq2 的 matcher, 代表域名)
+        # SequenceMatcher 会缓存 seq2 的分析结果，每个簇只建一次
+        clusters = []
         
         for brief in sorted_briefs:
+            title = self._clean_title(brief.get('headline', ''))
+            # analyzer 会带上 Item.domain；没有时才解析 URL
+            domain = brief.get('domain')
+            if domain is None:
+                domain = self._domain(brief.get('url', ''))
             merged = False
             for cluster in clusters:
-                rep = cluster[0]
-                sim = self._title_similarity(brief.get('headline', ''), rep.get('headline', ''))
-                same_domain = self._same_domain(brief.get('url', ''), rep.get('url', ''))
+                matcher, rep_domain = cluster[2], cluster[3]
+                matcher.set_seq1(title)
+                # real_quick_ratio / quick_ratio 都是 ratio 的上界
+                if (matcher.real_quick_ratio() <= min_threshold
+                        or matcher.quick_ratio() <= min_threshold):
+                    continue
+                sim = matcher.ratio()
+                same_domain = domain == rep_domain and domain != ''
                 
                 if same_domain and sim > self.strict_threshold:
                     # 同域高相似 → 丢弃
@@ -52,11 +71,11 @@ class Deduplicator:
                     break
             
             if not merged:
-                clusters.append((brief, []))
+                clusters.append((brief, [], SequenceMatcher(None, '', title), domain))
         
         # 构建输出
         result = []
-        for rep, related in clusters:
+        for rep, related, _, _ in clusters:
             if related:
                 sources = [rep.get('source', '')]
                 sources.extend([b.get('source', '') for b in related])
@@ -66,20 +85,26 @@ class Deduplicator:
         
         return result
     
+    @staticmethod
+    def _clean_title(t: str) -> str:
+        """忽略大小写和标点"""
+        return _PUNCT_RE.sub('', t.lower().strip())
+    
     @staticmethod
     def _title_similarity(t1: str, t2: str) -> float:
         """标题相似度（忽略大小写和标点）"""
-        def clean(t):
-            return re.sub(r'[^\w\s]', '', t.lower().strip())
-        return SequenceMatcher(None, clean(t1), clean(t2)).ratio()
+        return SequenceMatcher(None, Deduplicator._clean_title(t1), Deduplicator._clean_title(t2)).ratio()
+    
+    @staticmethod
+    def _domain(url: str) -> str:
+        """规范化域名（去掉 www.），解析失败返回空串"""
+        try:
+            return urlparse(url).netloc.replace('www.', '')
+        except (ValueError, TypeError):
+            return ''
     
     @staticmethod  
     def _same_domain(url1: str, url2: str) -> bool:
         """URL 域名是否相同"""
-        from urllib.parse import urlparse
-        try:
-            d1 = urlparse(url1).netloc.replace('www.', '')
-            d2 = urlparse(url2).netloc.replace('www.', '')
-            return d1 == d2 and d1 != ''
-        except:
-            return False
\ No newline at end of file
+        d1 = Deduplicator._domain(url1)
+        return d1 != '' and d1 == Deduplicator._domain(url2)
\ No newline at end of file
@@ -1,11 +1,12 @@
 """Layer 1: Parallel data fetching"""
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
-import json
+import asyncio
 from pathlib import Path
 
 from sources.base import DataSource, Item
+from utils.json_utils import read_jsonl, write_jsonl
 from utils.state import StateManager
 
 
@@ -18,6 +19,15 @@ class ParallelFetcher:
     def __init__(self, sources: List[DataSource], state_manager: StateManager):
         self.sources = sources
         self.state = state_manager
+        # Blocking sources share one pool, reused across fetch_all calls
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, min(self.MAX_CONCURRENCY, len(sources))),
+            thread_name_prefix="fetcher",
+        )
+
+    # Max sources fetched at once / per-source timeout (seconds)
+    MAX_CONCURRENCY = 32
+    SOURCE_TIMEOUT = 90
 
     def fetch_all(self, hours_ago: Optional[int] = None) -> List[Item]:
         """
@@ -29,42 +39,56 @@ class ParallelFetcher:
         Returns:
             List of deduplicated Item objects
         """
+        return asyncio.run(self.fetch_all_async(hours_ago=hours_ago))
+
+    async def fetch_all_async(self, hours_ago: Optional[int] = None) -> List[Item]:
+        """
+        Fetch all sources on one event loop
+
+        Blocking sources run in a shared thread pool via DataSource.fetch_async;
+        results are deduplicated against state as each source finishes.
+        """
         all_items = []
 
         print(f"\n📡 Fetching from {len(self.sources)} sources...")
 
-        with ThreadPoolExecutor(max_workers=len(self.sources)) as executor:
-            # Submit all tasks
-            futures = {
-                executor.submit(self._fetch_source, src, hours_ago): src
-                for src in self.sources
-            }
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
 
-            # Collect results
-            for future in as_completed(futures):
-                source = futures[future]
+        async def fetch_one(source: DataSource):
+            async with semaphore:
                 try:
-                    items = future.result(timeout=90)
-
-                    # Deduplicate against state
-                    new_items = [
-                        item for item in items
-                        if not self.state.is_seen(item.id)
-                    ]
+                    items = await asyncio.wait_for(
+                        source.fetch_async(hours_ago=hours_ago, executor=self._executor),
+                        timeout=self.SOURCE_TIMEOUT,
+                    )
+                    return source, items, None
+                except asyncio.TimeoutError:
+                    return source, None, TimeoutError(f"timed out after {self.SOURCE_TIMEOUT}s")
+                except Exception as e:
+                    return source, None, e
 
-                    # Mark as seen
-                    for item in new_items:
-                        self.state.mark_seen(item.id)
+        # Collect results
+        for next_done in asyncio.as_completed([fetch_one(src) for src in self.sources]):
+            source, items, error = await next_done
+            if error is not None:
+                print(f"  ✗ {source.source_name}: {error}")
+                continue
 
-                    all_items.extend(new_items)
-                    print(f"  ✓ {source.source_name}: {len(new_items)} new items (total fetched: {len(items)})")
+            # Deduplicate against state, then mark the new ones as seen
+            seen = self.state.is_seen_batch(item.id for item in items)
+            new_items = [item for item, was_seen in zip(items, seen) if not was_seen]
+            self.state.mark_seen_batch(item.id for item in new_items)
 
-                except Exception as e:
-                    print(f"  ✗ {source.source_name}: {e}")
+            all_items.extend(new_items)
+            print(f"  ✓ {source.source_name}: {len(new_items)} new items (total fetched: {len(items)})")
 
         print(f"\n✅ Total new items: {len(all_items)}")
         return all_items
 
+    def close(self):
+        """Shut down the shared thread pool"""
+        self._executor.shutdown()
+
     def _fetch_source(self, source: DataSource, hours_ago: Optional[int]) -> List[Item]:
         """Fetch single data source (with error handling)"""
         return source.fetch(hours_ago=hours_ago)
@@ -73,20 +97,10 @@ class ParallelFetcher:
         """Save raw fetched data to JSONL"""
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for item in items:
-                f.write(json.dumps(item.to_dict(), ensure_ascii=False) + '\n')
+        write_jsonl(output_path, (item.to_dict() for item in items))
 
         print(f"💾 Saved raw data: {output_path}")
 
     def load_raw_data(self, input_path: Path) -> List[Item]:
         """Load raw data from JSONL"""
-        items = []
-
-        with open(input_path, encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    data = json.loads(line)
-                    items.append(Item.from_dict(data))
-
-        return items
+        return [Item.from_dict(data) for data in read_jsonl(input_path)]
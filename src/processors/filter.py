@@ -1,13 +1,19 @@
 """Layer 2: 智能过滤 - 粗排精排 + 候选池 + 去重"""
 
-import json
+import heapq
 import math
 import re
 from typing import List, Dict, Tuple
 from pathlib import Path
-from collections import Counter
+from collections import Counter, defaultdict
+
+try:
+    import ahocorasick  # pyahocorasick：短语关键词一次扫描匹配
+except ImportError:
+    ahocorasick = None
 
 from sources.base import Item
+from utils.json_utils import read_jsonl, write_jsonl
 from utils.time_utils import is_within_hours
 from .filters import get_filter, FILTER_REGISTRY
 
@@ -56,10 +62,72 @@ class RelevanceScorer:
     基于老板关注领域关键词，给每条新闻打相关性分
     """
 
-    def __init__(self, interest_keywords: dict = None, k1: float = 1.5, b: float = 0.75):
+    def __init__(self, interest_keywords: dict = None, k1: float = 1.5, b: float = 0.75,
+                 avg_len: float = 200):
+        """
+        Args:
+            avg_len: 假设的平均文档长度（词数），用于 BM25 长度归一化
+        """
         self.keywords = interest_keywords or OWNER_INTEREST_KEYWORDS
         self.k1 = k1
         self.b = b
+        self.avg_len = avg_len
+        # BM25 常量：分母中的长度项 = k1 * (1 - b + b * len / avg_len) = _c1 + _c2 * len
+        self._k1p1 = k1 + 1
+        self._c1 = k1 * (1 - b)
+        self._c2 = k1 * b / avg_len
+
+        # 预处理关键词（只做一次），每项带上关键词序号，打分时按原顺序累加：
+        # - 含空格的短语、中文关键词：子串计数（中文不分词，\b 在汉字之间不成立）
+        # - 纯单词（\w+）：两端 \b 意味着只能匹配整个单词，互不重叠，
+        #   合并成一个 \b(kw1|kw2|...)\b，一次扫描统计全部词频
+        # - 其余单词（如 fine-tuning）：匹配区间可能与别的词重叠，各自预编译
+        self._phrases = []
+        self._patterns = []
+        self._word_weights = {}  # word -> (序号, weight)
+        for idx, (keyword, weight) in enumerate(self.keywords.items()):
+            keyword_lower = keyword.lower()
+            if ' ' in keyword_lower or self._CJK_RE.search(keyword_lower):
+                self._phrases.append((idx, keyword_lower, weight))
+            elif self._WORD_RE.fullmatch(keyword_lower):
+                first_idx, prev_weight = self._word_weights.get(keyword_lower, (idx, 0))
+                self._word_weights[keyword_lower] = (first_idx, prev_weight + weight)
+            else:
+                self._patterns.append(
+                    (idx, re.compile(r'\b' + re.escape(keyword_lower) + r'\b'), weight)
+                )
+        self._word_re = None
+        if self._word_weights:
+            words = sorted(self._word_weights, key=len, reverse=True)  # 长词在前，少回溯
+            self._word_re = re.compile(r'\b(' + '|'.join(map(re.escape, words)) + r')\b')
+
+        # 有 pyahocorasick 时所有子串关键词建一个自动机，一次扫描统计全部词频
+        self._phrase_automaton = None
+        if ahocorasick is not None and self._phrases:
+            self._phrase_automaton = ahocorasick.Automaton()
+            for entry in self._phrases:
+                self._phrase_automaton.add_word(entry[1], entry)
+            self._phrase_automaton.make_automaton()
+
+    _WORD_RE = re.compile(r'\w+')
+    _CJK_RE = re.compile(r'[\u4e00-\u9fff]')
+
+    def _count_phrases(self, text: str) -> List[Tuple[int, int, float]]:
+        """子串关键词词频（同一关键词不重叠计数，与 str.count 一致），返回 [(序号, tf, weight)]"""
+        if self._phrase_automaton is None:
+            counts = ((entry, text.count(entry[1])) for entry in self._phrases)
+            return [(idx, tf, weight) for (idx, _, weight), tf in counts if tf]
+
+        tf_by_phrase = Counter()
+        last_end = {}
+        # iter 按匹配结束位置递增产出；与上一次计数的同一短语重叠的跳过
+        for end, entry in self._phrase_automaton.iter(text):
+            phrase = entry[1]
+            if end - len(phrase) < last_end.get(phrase, -1):
+                continue
+            last_end[phrase] = end
+            tf_by_phrase[entry] += 1
+        return [(idx, tf, weight) for (idx, _, weight), tf in tf_by_phrase.items()]
 
     def score(self, item: Item) -> float:
         """
@@ -68,31 +136,37 @@ class RelevanceScorer:
         Returns:
             float: 相关性分数（0~100）
         """
-        text = f"{item.title} {item.title} {item.text}".lower()  # 标题权重 x2
-        text_len = len(text.split())
-        avg_len = 200  # 假设平均文档长度
+        text = f"{item.title.lower()} {item.search_text}"  # 标题权重 x2，复用 item 上缓存的小写正文
+        text_len = text.count(' ') + 1  # 近似词数，不为 split() 分配整张 token 列表
+
+        # 统计词频 -> [(关键词序号, tf, weight)]
+        matches = []
+        if self._word_re is not None:
+            for word, tf in Counter(self._word_re.findall(text)).items():
+                idx, weight = self._word_weights[word]
+                matches.append((idx, tf, weight))
+        for idx, pattern, weight in self._patterns:
+            tf = len(pattern.findall(text))
+            if tf:
+                matches.append((idx, tf, weight))
+        matches.extend(self._count_phrases(text))
+        matches.sort()  # 按关键词原顺序累加，浮点结果与逐词扫描一致
 
         total_score = 0.0
-
-        for keyword, weight in self.keywords.items():
-            keyword_lower = keyword.lower()
-
-            # 统计词频
-            if ' ' in keyword_lower:
-                tf = text.count(keyword_lower)
-            else:
-                tf = len(re.findall(r'\b' + re.escape(keyword_lower) + r'\b', text))
-
-            if tf == 0:
-                continue
-
+        length_norm = self._c1 + self._c2 * text_len
+        for _, tf, weight in matches:
             # BM25 公式（简化版，IDF 用 keyword weight 替代）
             idf = weight  # 用人工权重替代 IDF
-            norm_tf = (tf * (self.k1 + 1)) / (tf + self.k1 * (1 - self.b + self.b * text_len / avg_len))
+            norm_tf = (tf * self._k1p1) / (tf + length_norm)
             total_score += idf * norm_tf
 
         return total_score
 
+    def score_batch(self, items: List[Item]) -> List[float]:
+        """批量打分，结果与逐条 score 一致"""
+        score = self.score
+        return [score(item) for item in items]
+
 
 class DedupEngine:
     """
@@ -106,28 +180,44 @@ class DedupEngine:
         """
         self.threshold = threshold
 
-    def _tokenize(self, text: str) -> set:
-        """将标题分词为 token 集合"""
-        text = text.lower()
+    _TOKEN_RE = re.compile(r'[a-z0-9\u4e00-\u9fff]+')
+
+    def _tokenize(self, text: str) -> frozenset:
+        """将标题分词为 token 集合（存 token 的 hash，集合运算只比较整数）"""
         # 英文按空格/标点分词
-        tokens = set(re.findall(r'[a-z0-9\u4e00-\u9fff]+', text))
-        # 中文按字分词（简单但有效）
-        chinese_chars = set(re.findall(r'[\u4e00-\u9fff]', text))
-        tokens.update(chinese_chars)
-        return tokens
-
-    def _jaccard(self, set_a: set, set_b: set) -> float:
-        """计算 Jaccard 相似度"""
-        if not set_a or not set_b:
+        tokens = self._TOKEN_RE.findall(text.lower())
+        # 中文按字分词（简单但有效）：token 只含 [a-z0-9] 和汉字，非 ASCII 字符即汉字
+        tokens.extend([char for token in tokens if not token.isascii() for char in token if not char.isascii()])
+        return frozenset(map(hash, tokens))
+
+    def _jaccard(self, set_a: frozenset, set_b: frozenset) -> float:
+        """
+        计算 Jaccard 相似度（|A∪B| = |A| + |B| - |A∩B|，不构造并集）
+
+        Jaccard 上界是 min(|A|,|B|) / max(|A|,|B|)，上界已低于阈值时不求交集直接返回 0
+        （只影响低于阈值的返回值，重复判定不变）
+        """
+        len_a, len_b = len(set_a), len(set_b)
+        if not len_a or not len_b:
+            return 0.0
+        if min(len_a, len_b) / max(len_a, len_b) < self.threshold:
             return 0.0
-        intersection = set_a & set_b
-        union = set_a | set_b
-        return len(intersection) / len(union)
+        intersection = len(set_a & set_b)
+        return intersection / (len_a + len_b - intersection)
+
+    def _prefix_length(self, size: int) -> int:
+        """
+        前缀过滤长度：Jaccard >= threshold 的两个集合，按同一全局 token 顺序排序后，
+        各自前 |A| - ceil(threshold * |A|) + 1 个 token 中必有一个相同
+        """
+        return size - math.ceil(self.threshold * size - 1e-9) + 1
 
     def deduplicate(self, items: List[Item]) -> List[Item]:
         """
         去重：保留每组重复中得分最高的
 
+        只和前缀里有共同 token 的已保留条目算 Jaccard（前缀过滤，结果与逐条比较完全一致）。
+
         Returns:
             去重后的 Item 列表
         """
@@ -137,29 +227,76 @@ class DedupEngine:
         # 预计算所有标题的 token 集合
         token_sets = [(item, self._tokenize(item.title)) for item in items]
 
-        kept = []
+        if self.threshold <= 0:
+            # 阈值为 0 时任意两条都算重复，前缀过滤不适用
+            return self._deduplicate_pairwise(token_sets)
+
+        # 全局 token 顺序：低频在前，前缀里的 token 更有区分度、倒排表更短
+        doc_freq = Counter(token for _, tokens in token_sets for token in tokens)
+
+        def _prefix(tokens: frozenset) -> List[int]:
+            ordered = sorted(tokens, key=lambda t: (doc_freq[t], t))
+            return ordered[:self._prefix_length(len(ordered))]
+
+        kept = []  # [(item, tokens, prefix)]
+        prefix_index = {}  # token hash -> 前缀含该 token 的 kept 下标
         removed_count = 0
 
-        for i, (item, tokens) in enumerate(token_sets):
+        for item, tokens in token_sets:
+            prefix = _prefix(tokens)
+            candidates = set()
+            for token in prefix:
+                candidates.update(prefix_index.get(token, ()))
+
             is_duplicate = False
-            for j, kept_item in enumerate(kept):
-                kept_tokens = self._tokenize(kept_item.title)
+            # 按 kept 顺序检查，命中的第一个与逐条比较时相同
+            for j in sorted(candidates):
+                kept_item, kept_tokens, kept_prefix = kept[j]
                 sim = self._jaccard(tokens, kept_tokens)
                 if sim >= self.threshold:
                     # 重复了，保留得分高的
                     if item.score > kept_item.score:
-                        kept[j] = item
+                        for token in kept_prefix:
+                            prefix_index[token].discard(j)
+                        kept[j] = (item, tokens, prefix)
+                        for token in prefix:
+                            prefix_index.setdefault(token, set()).add(j)
                     is_duplicate = True
                     removed_count += 1
                     break
 
             if not is_duplicate:
-                kept.append(item)
+                for token in prefix:
+                    prefix_index.setdefault(token, set()).add(len(kept))
+                kept.append((item, tokens, prefix))
 
         if removed_count > 0:
             print(f"     🔄 去重: 合并了 {removed_count} 条重复内容")
 
-        return kept
+        return [item for item, _, _ in kept]
+
+    def _deduplicate_pairwise(self, token_sets: List[Tuple[Item, frozenset]]) -> List[Item]:
+        """逐条与已保留条目比较（threshold <= 0 时使用）"""
+        kept = []  # [(item, tokens)]
+        removed_count = 0
+
+        for item, tokens in token_sets:
+            is_duplicate = False
+            for j, (kept_item, kept_tokens) in enumerate(kept):
+                if self._jaccard(tokens, kept_tokens) >= self.threshold:
+                    if item.score > kept_item.score:
+                        kept[j] = (item, tokens)
+                    is_duplicate = True
+                    removed_count += 1
+                    break
+
+            if not is_duplicate:
+                kept.append((item, tokens))
+
+        if removed_count > 0:
+            print(f"     🔄 去重: 合并了 {removed_count} 条重复内容")
+
+        return [item for item, _ in kept]
 
 
 class SmartFilter:
@@ -178,6 +315,7 @@ class SmartFilter:
         self.config = config
         self.channels = config.get('channels', {})
         self.defaults = config.get('defaults', {})
+        self._resolved_channels = self._resolve_channels()
         self.relevance_scorer = RelevanceScorer()
         self.dedup_engine = DedupEngine(threshold=0.5)
 
@@ -195,20 +333,17 @@ class SmartFilter:
         print(f"\n🔍 过滤 {len(items)} 条数据...")
         print(f"   已注册策略: {list(FILTER_REGISTRY.keys())}")
 
-        # Step 0: 全局去重
-        items = self.dedup_engine.deduplicate(items)
-
-        # 按频道分组
-        by_channel = {}
+        # 按频道分组（去重在频道内做，跨频道重复由最后一步的全局去重处理）
+        by_channel = defaultdict(list)
         for item in items:
-            by_channel.setdefault(item.channel, []).append(item)
+            by_channel[item.channel].append(item)
 
         filtered = []
         candidate_pool = []  # 候选池
 
         # 对每个频道应用策略
-        for channel in sorted(by_channel.keys()):
-            channel_items = by_channel[channel]
+        # 按频道名排序：filtered 按频道顺序拼接，后面的去重同分时保留先出现的，顺序影响结果
+        for channel, channel_items in sorted(by_channel.items(), key=lambda kv: kv[0]):
             ch_config = self._get_channel_config(channel)
             strategy_name = ch_config.get('strategy', 'keyword_score')
 
@@ -223,11 +358,26 @@ class SmartFilter:
             if len(time_filtered) < len(channel_items):
                 print(f"     ⏰ 时效过滤: {len(time_filtered)}/{len(channel_items)} 在 {max_age_hours}h 内")
 
+            # Step 0: 频道内去重（只比较时效内的条目）
+            time_filtered = self.dedup_engine.deduplicate(time_filtered)
+
             # Step 1: BM25 相关性粗排打分
-            for item in time_filtered:
-                relevance = self.relevance_scorer.score(item)
+            for item, relevance in zip(time_filtered, self.relevance_scorer.score_batch(time_filtered)):
                 item.metadata['relevance_score'] = relevance
 
+            # 大频道可选上限：只有相关性 Top M 跑策略，其余直接判断能否进候选池
+            strategy_items = time_filtered
+            overflow = []
+            max_strategy_items = ch_config.get('max_strategy_items')
+            if max_strategy_items and len(time_filtered) > max_strategy_items:
+                strategy_items = heapq.nlargest(
+                    max_strategy_items, time_filtered,
+                    key=lambda x: x.metadata['relevance_score']
+                )
+                kept_ids = set(map(id, strategy_items))
+                overflow = [item for item in time_filtered if id(item) not in kept_ids]
+                print(f"     ✂️  策略上限: 仅评估相关性 Top {max_strategy_items}/{len(time_filtered)}")
+
             # 应用原有过滤策略
             try:
                 filter_class = get_filter(strategy_name)
@@ -236,7 +386,7 @@ class SmartFilter:
                 passed = []
                 candidates = []
 
-                for item in time_filtered:
+                for item in strategy_items:
                     score = filter_instance.filter(item)
                     relevance = item.metadata.get('relevance_score', 0)
 
@@ -252,6 +402,13 @@ class SmartFilter:
                         item.filtered = True
                         candidates.append(item)
 
+                for item in overflow:
+                    relevance = item.metadata['relevance_score']
+                    if relevance > 10:
+                        item.score = relevance * 0.1
+                        item.filtered = True
+                        candidates.append(item)
+
                 filtered.extend(passed)
                 candidate_pool.extend(candidates)
 
@@ -263,22 +420,27 @@ class SmartFilter:
         # Step 2: 候选池补充（如果高分内容不够）
         min_total = 30  # 最少期望条数
         if len(filtered) < min_total and candidate_pool:
-            # 按相关性排序候选池
-            candidate_pool.sort(key=lambda x: x.metadata.get('relevance_score', 0), reverse=True)
+            # 按相关性取候选池 Top K
             supplement_count = min(min_total - len(filtered), len(candidate_pool))
-            supplement = candidate_pool[:supplement_count]
+            supplement = heapq.nlargest(
+                supplement_count, candidate_pool, key=lambda x: x.metadata.get('relevance_score', 0)
+            )
             filtered.extend(supplement)
             print(f"\n  📦 候选池补充: +{supplement_count} 条 (总计 {len(filtered)} 条)")
 
-        # Step 3: 频道内去重
+        # Step 3: 跨频道去重（候选池补充也可能带回重复）
         filtered = self.dedup_engine.deduplicate(filtered)
 
         print(f"\n✅ 过滤完成: {len(filtered)} 条")
         return filtered
 
     def _get_channel_config(self, channel: str) -> dict:
+        """获取频道配置（继承已在 __init__ 中展开）"""
+        return self._resolved_channels.get(channel, self.defaults)
+
+    def _resolve_channels(self) -> Dict[str, dict]:
         """
-        获取频道配置，支持关键词继承
+        一次性展开所有频道配置的关键词继承
 
         配置示例:
         ```yaml
@@ -289,53 +451,40 @@ class SmartFilter:
               programming: 3
         ```
         """
-        if channel in self.channels:
-            config = dict(self.channels[channel])
+        resolved = {}
+        for channel, channel_config in self.channels.items():
+            config = dict(channel_config)
+            keywords = config.get('keywords')
 
-            # 处理关键词继承
-            if 'keywords' in config and '_inherit' in config['keywords']:
-                inherit_from = config['keywords']['_inherit']
-                inherited_keywords = {}
+            # 处理关键词继承（新建 dict，不改动原始配置）
+            if keywords and '_inherit' in keywords:
+                merged_keywords = {}
 
                 # 从其他频道继承关键词
-                for parent_channel in inherit_from:
+                for parent_channel in keywords['_inherit']:
                     if parent_channel in self.channels:
                         parent_keywords = self.channels[parent_channel].get('keywords', {})
-                        inherited_keywords.update(parent_keywords)
-
-                # 移除 _inherit 标记
-                del config['keywords']['_inherit']
+                        merged_keywords.update(parent_keywords)
 
-                # 合并继承的和自己的关键词（自己的优先）
-                merged_keywords = inherited_keywords.copy()
-                merged_keywords.update(config['keywords'])
+                # 合并继承的和自己的关键词（自己的优先），移除 _inherit 标记
+                merged_keywords.update(keywords)
+                merged_keywords.pop('_inherit', None)
                 config['keywords'] = merged_keywords
 
-            return config
-
-        return self.defaults.copy()
+            resolved[channel] = config
+        return resolved
 
     def save_filtered_data(self, items: List[Item], output_path: Path):
         """保存过滤后的数据到 JSONL"""
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for item in items:
-                f.write(json.dumps(item.to_dict(), ensure_ascii=False) + '\n')
+        write_jsonl(output_path, (item.to_dict() for item in items))
 
         print(f"💾 已保存过滤数据: {output_path}")
 
     def load_filtered_data(self, input_path: Path) -> List[Item]:
         """从 JSONL 加载过滤后的数据"""
-        items = []
-
-        with open(input_path, encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    data = json.loads(line)
-                    items.append(Item.from_dict(data))
-
-        return items
+        return [Item.from_dict(data) for data in read_jsonl(input_path)]
 
 
 def create_custom_filter(name: str, score_func):
@@ -1,5 +1,6 @@
 """过滤策略抽象基类"""
 
+import re
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any
 
@@ -24,6 +25,11 @@ class FilterStrategy(ABC):
         self.config = config
         self.min_score = config.get('min_score', 0)
         self.blacklist = config.get('blacklist', [])
+        # 黑名单合并成一个正则，一次 search 判定（命中任意一项即返回）
+        self._blacklist_re = (
+            re.compile('|'.join(re.escape(blocked.lower()) for blocked in self.blacklist))
+            if self.blacklist else None
+        )
 
     @abstractmethod
     def calculate_score(self, item: Item) -> float:
@@ -49,11 +55,8 @@ class FilterStrategy(ABC):
             Optional[float]: 如果通过过滤返回得分，否则返回 None
         """
         # 检查黑名单
-        if self.blacklist:
-            text = f"{item.title} {item.text}".lower()
-            for blocked in self.blacklist:
-                if blocked.lower() in text:
-                    return None
+        if self._blacklist_re is not None and self._blacklist_re.search(item.search_text):
+            return None
 
         # 计算得分
         score = self.calculate_score(item)
@@ -1,8 +1,9 @@
 """关键词评分过滤策略"""
 
+import re
+
 from .base import FilterStrategy
 from sources.base import Item
-from utils.text_utils import calculate_keyword_score
 
 
 class KeywordScoreFilter(FilterStrategy):
@@ -24,11 +25,22 @@ class KeywordScoreFilter(FilterStrategy):
     def __init__(self, config):
         super().__init__(config)
         self.keywords = config.get('keywords', {})
+        # 关键词小写 + 单词边界正则只构建一次：[(keyword, weight, pattern)]，短语的 pattern 为 None
+        self._lower_keywords = {k.lower(): w for k, w in self.keywords.items()}
+        self._matchers = [
+            (keyword, weight, None if ' ' in keyword else re.compile(r'\b' + re.escape(keyword) + r'\b'))
+            for keyword, weight in self._lower_keywords.items()
+        ]
 
     def calculate_score(self, item: Item) -> float:
-        """基于关键词匹配计算得分"""
-        full_text = f"{item.title} {item.text}"
-        score = calculate_keyword_score(full_text, self.keywords)
+        """基于关键词匹配计算得分（与 utils.text_utils.calculate_keyword_score 相同的计分规则）"""
+        text = item.search_text
+        score = 0
+        for keyword, weight, pattern in self._matchers:
+            # 短语按子串计数，单词按词边界计数
+            count = text.count(keyword) if pattern is None else len(pattern.findall(text))
+            if count:
+                score += weight * count
         return score
 
     def __repr__(self):
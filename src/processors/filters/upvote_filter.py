@@ -21,6 +21,9 @@ class UpvoteWeightedFilter(FilterStrategy):
     ```
     """
 
+    # 不同数据源的投票字段名，按优先级排列
+    _UPVOTE_FIELDS = ('upvotes', 'stars', 'score', 'points', 'likes')
+
     def __init__(self, config):
         super().__init__(config)
         self.upvote_multiplier = config.get('upvote_multiplier', 1.0)
@@ -32,15 +35,9 @@ class UpvoteWeightedFilter(FilterStrategy):
         # 基础关键词得分
         base_score = self.keyword_filter.calculate_score(item)
 
-        # 查找投票数
-        upvotes = 0
+        # 查找投票数：按优先级取第一个存在的字段
         metadata = item.metadata or {}
-
-        # 尝试不同的字段名
-        for field in ['upvotes', 'stars', 'score', 'points', 'likes']:
-            if field in metadata:
-                upvotes = metadata[field]
-                break
+        upvotes = next((metadata[field] for field in self._UPVOTE_FIELDS if field in metadata), 0)
 
         # 投票加权
         bonus = upvotes * self.upvote_multiplier
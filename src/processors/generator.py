@@ -1,16 +1,100 @@
 """Layer 4: Report generation (Markdown, HTML, Cards, RSS) - v0.2.0 增强版"""
 
-import json
+import functools
+import operator
+import time
 import yaml
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, List
-from jinja2 import Environment, FileSystemLoader, Template
+from typing import Dict, Iterable, Iterator, List, Optional
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+try:
+    from yaml import CSafeLoader as _SafeLoader  # libyaml C loader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+
+# briefs 中的元数据 key（非 section 数据）
+META_KEYS = frozenset({'__trends__', '__meta__', '__executive_summary__'})
+
+# Single-pass HTML escaping for the fallback writers (str.translate runs in C)
+_HTML_ESCAPE_TABLE = str.maketrans({
+    '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;',
+})
+
+
+def _escape(value) -> str:
+    """Escape text interpolated into fallback HTML"""
+    return str(value).translate(_HTML_ESCAPE_TABLE)
+
+
+# Report files are tens to hundreds of KiB; a 64 KiB buffer (vs the 8 KiB default) cuts write() calls
+_WRITE_BUFFER = 1 << 16
+
+
+def _now_str() -> str:
+    """Report generation timestamp"""
+    return time.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _brief_importance(brief: Dict) -> int:
+    """Sort key for briefs (missing importance counts as 3)"""
+    return brief.get('importance', 3)
+
+
+# Raw Items usually are sources.base.Item; getattr fallbacks cover other objects
+_channel_and_score = operator.attrgetter('channel', 'score')
+_item_link = operator.attrgetter('title', 'url')
+_item_md_fields = operator.attrgetter('title', 'url', 'metadata', 'source')
+
+
+def _group_by_channel(items: List) -> Dict[str, List]:
+    """Group raw Items by channel, each group sorted by score (highest first, ties keep input order)"""
+    # (-score, index, item): plain tuple sort, no key callable; index keeps ties stable
+    decorated = defaultdict(list)
+    for idx, item in enumerate(items):
+        try:
+            channel, score = _channel_and_score(item)
+        except AttributeError:
+            channel, score = getattr(item, 'channel', 'general'), getattr(item, 'score', 0)
+        decorated[channel].append((-score, idx, item))
+
+    by_channel = {}
+    for channel, entries in decorated.items():
+        entries.sort()
+        by_channel[channel] = [item for _, _, item in entries]
+    return by_channel
+
+
+def _write_lines(output_path: Path, lines: Iterable[str]):
+    """Stream lines to output_path, newline-separated (same output as '\\n'.join, no full-report string)"""
+    lines = iter(lines)
+    with open(output_path, 'w', encoding='utf-8', buffering=_WRITE_BUFFER) as f:
+        f.write(next(lines, ''))
+        f.writelines(f"\n{line}" for line in lines)
+
+
+def _write_chunks(output_path: Path, chunks: Iterable[str]):
+    """Stream string fragments to output_path as-is (no concatenated full-report string)"""
+    with open(output_path, 'w', encoding='utf-8', buffering=_WRITE_BUFFER) as f:
+        f.writelines(chunks)
 
 
 class ReportGenerator:
     """Multi-format report generator with pluggable template system (v0.2.0)"""
 
+    __slots__ = (
+        'config', 'formats', 'generate_rss', 'template_name', 'project_root', 'template_dir',
+        'section_configs', '_section_order', 'jinja_env', '_md_tmpl', '_html_tmpl',
+    )
+
+    # sections.yaml path -> (mtime_ns, sections), shared across instances
+    _sections_cache: Dict[str, tuple] = {}
+    # template dir -> Jinja2 Environment, shared across instances
+    _env_cache: Dict[str, Environment] = {}
+
     def __init__(self, config: dict):
         self.config = config
         self.formats = config.get('generate', {}).get('formats', ['markdown', 'html'])
@@ -23,25 +107,70 @@ class ReportGenerator:
 
         # Load section configurations
         self.section_configs = self._load_sections_config()
+        # section_configs doesn't change after init, so sort once
+        self._section_order = sorted(
+            self.section_configs.keys(),
+            key=lambda k: self.section_configs[k].get('order', 999)
+        )
 
         # Initialize Jinja2 environment if templates exist
+        # (one Environment per template dir, so compiled templates outlive this instance)
         if self.template_dir.exists():
-            self.jinja_env = Environment(
-                loader=FileSystemLoader(str(self.template_dir)),
-                trim_blocks=True,
-                lstrip_blocks=True
-            )
+            self.jinja_env = type(self)._env_cache.get(str(self.template_dir))
+            if self.jinja_env is None:
+                self.jinja_env = Environment(
+                    loader=FileSystemLoader(str(self.template_dir)),
+                    bytecode_cache=self._make_bytecode_cache(),
+                    auto_reload=False,  # templates don't change while a report is being generated
+                    trim_blocks=True,
+                    lstrip_blocks=True
+                )
+                type(self)._env_cache[str(self.template_dir)] = self.jinja_env
         else:
             self.jinja_env = None
             print(f"⚠️  Template directory not found: {self.template_dir}, using fallback")
 
+        # Load report templates once per instance (None = not available, resolved at render time)
+        self._md_tmpl = self._load_template('report.md.j2')
+        self._html_tmpl = self._load_template('report.html.j2')
+
+    def _load_template(self, name: str) -> Optional[Template]:
+        """Compile a template up front; errors are reported when the report is rendered"""
+        if self.jinja_env is None:
+            return None
+        try:
+            return self.jinja_env.get_template(name)
+        except Exception:
+            return None
+
+    def _make_bytecode_cache(self):
+        """
+        Compiled-template cache shared across runs (skips lex/parse/compile on warm starts)
+
+        Entries are keyed by template source checksum, so edited templates recompile.
+        Returns None (no cache) if the cache directory can't be created.
+        """
+        cache_dir = self.project_root / 'data' / 'cache' / 'jinja'
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            return None
+        return FileSystemBytecodeCache(str(cache_dir), '%s.cache')
+
     def _load_sections_config(self) -> Dict:
-        """Load section metadata from sections.yaml"""
+        """Load section metadata from sections.yaml (parsed once per file version)"""
         sections_file = self.project_root / 'config' / 'sections.yaml'
         if sections_file.exists():
+            mtime_ns = sections_file.stat().st_mtime_ns
+            cache = type(self)._sections_cache
+            cached = cache.get(str(sections_file))
+            if cached is not None and cached[0] == mtime_ns:
+                return cached[1]
             with open(sections_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                return data.get('sections', {})
+                data = yaml.load(f, Loader=_SafeLoader)
+            sections = data.get('sections', {})
+            cache[str(sections_file)] = (mtime_ns, sections)
+            return sections
         else:
             return {
                 'ai': {'title': 'AI & 科技', 'emoji': '🤖', 'order': 1, 'color': '#6366f1'},
@@ -55,10 +184,7 @@ class ReportGenerator:
 
     def _get_section_order(self) -> List[str]:
         """Get sections sorted by order field"""
-        return sorted(
-            self.section_configs.keys(),
-            key=lambda k: self.section_configs[k].get('order', 999)
-        )
+        return self._section_order
 
     def generate(self, items, date_str: str, output_dir: Path):
         """
@@ -74,28 +200,37 @@ class ReportGenerator:
         # 判断是 Items 还是 AI briefs
         if isinstance(items, dict):
             # AI briefs 格式: {section: [briefs], __executive_summary__: str}
-            if 'markdown' in self.formats:
-                md_path = output_dir / 'report.md'
-                self.generate_markdown_from_briefs(items, date_str, md_path)
-
-            if 'html' in self.formats:
-                html_path = output_dir / 'report.html'
-                self.generate_html_from_briefs(items, date_str, html_path)
+            # 排序 + 统计只做一次，两种格式共用
+            prepared = self._prepare_briefs_for_template(items)
+            generate_md = functools.partial(self.generate_markdown_from_briefs, prepared=prepared)
+            generate_html = functools.partial(self.generate_html_from_briefs, prepared=prepared)
         else:
             # 原始 Items
-            if 'markdown' in self.formats:
-                md_path = output_dir / 'report.md'
-                self.generate_markdown(items, date_str, md_path)
-
-            if 'html' in self.formats:
-                html_path = output_dir / 'report.html'
-                self.generate_html(items, date_str, html_path)
+            generate_md, generate_html = self.generate_markdown, self.generate_html
+
+        # 所有格式共用同一个生成时间
+        generated_time = _now_str()
+        tasks = []
+        if 'markdown' in self.formats:
+            tasks.append((functools.partial(generate_md, generated_time=generated_time), output_dir / 'report.md'))
+        if 'html' in self.formats:
+            tasks.append((generate_html, output_dir / 'report.html'))
+
+        # 各格式互不依赖（渲染 + 写文件），多于一种时并行生成
+        if len(tasks) > 1:
+            with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="report") as executor:
+                futures = [executor.submit(fn, items, date_str, path) for fn, path in tasks]
+                for future in futures:
+                    future.result()
+        else:
+            for fn, path in tasks:
+                fn(items, date_str, path)
 
         print(f"✅ 报告已生成: {output_dir}")
 
     def _sort_briefs_by_importance(self, briefs: List[Dict]) -> List[Dict]:
         """按 importance 降序排序 briefs"""
-        return sorted(briefs, key=lambda x: x.get('importance', 3), reverse=True)
+        return sorted(briefs, key=_brief_importance, reverse=True)
 
     def _prepare_briefs_for_template(self, raw_briefs: Dict) -> Dict:
         """
@@ -106,17 +241,15 @@ class ReportGenerator:
         """
         executive_summary = raw_briefs.get('__executive_summary__', '')
 
-        # 过滤掉特殊 key 和空 section
+        # 过滤掉特殊 key 和空 section，排序和统计信息在同一遍里完成
         content_briefs = {}
-        for k, v in raw_briefs.items():
-            if k.startswith('__') or not v or not isinstance(v, list):
+        stats = {}
+        for section, items in raw_briefs.items():
+            if section in META_KEYS or not items or not isinstance(items, list):
                 continue
             # 按 importance 排序
-            content_briefs[k] = self._sort_briefs_by_importance(v)
+            content_briefs[section] = self._sort_briefs_by_importance(items)
 
-        # 统计信息
-        stats = {}
-        for section, items in content_briefs.items():
             meta = self.section_configs.get(section, {})
             stats[section] = {
                 'count': len(items),
@@ -131,27 +264,31 @@ class ReportGenerator:
             'stats': stats,
         }
 
-    def generate_markdown_from_briefs(self, briefs: Dict, date_str: str, output_path: Path):
-        """从 AI briefs 生成 Markdown (使用 Jinja2 模板)"""
+    def generate_markdown_from_briefs(self, briefs: Dict, date_str: str, output_path: Path,
+                                      generated_time: Optional[str] = None,
+                                      prepared: Optional[Dict] = None):
+        """从 AI briefs 生成 Markdown (使用 Jinja2 模板)；prepared 为 _prepare_briefs_for_template 的结果，可复用"""
         output_path.parent.mkdir(parents=True, exist_ok=True)
+        generated_time = generated_time or _now_str()
 
-        prepared = self._prepare_briefs_for_template(briefs)
+        if prepared is None:
+            prepared = self._prepare_briefs_for_template(briefs)
         non_empty_briefs = prepared['briefs']
 
         if not non_empty_briefs:
             print("⚠️ No content to generate (all sections are empty)")
-            self._generate_empty_markdown(date_str, output_path)
+            self._generate_empty_markdown(date_str, output_path, generated_time)
             return
 
         # Use template if available
         if self.jinja_env:
             try:
-                template = self.jinja_env.get_template('report.md.j2')
+                template = self._md_tmpl or self.jinja_env.get_template('report.md.j2')
 
-                total_items = sum(len(items) for items in non_empty_briefs.values())
+                total_items = sum(map(len, non_empty_briefs.values()))
                 markdown = template.render(
                     date_str=date_str,
-                    generated_time=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    generated_time=generated_time,
                     total_items=total_items,
                     briefs=non_empty_briefs,
                     executive_summary=prepared['executive_summary'],
@@ -160,7 +297,7 @@ class ReportGenerator:
                     section_order=self._get_section_order()
                 )
 
-                with open(output_path, 'w', encoding='utf-8') as f:
+                with open(output_path, 'w', encoding='utf-8', buffering=_WRITE_BUFFER) as f:
                     f.write(markdown)
 
                 print(f"📄 Markdown 已生成 (使用模板 {self.template_name}): {output_path}")
@@ -170,13 +307,15 @@ class ReportGenerator:
 
         # Fallback to hardcoded template
         self._generate_markdown_fallback(non_empty_briefs, date_str, output_path,
-                                          prepared['executive_summary'])
+                                          prepared['executive_summary'], generated_time)
 
-    def generate_html_from_briefs(self, briefs: Dict, date_str: str, output_path: Path):
-        """从 AI briefs 生成 HTML (使用 Jinja2 模板)"""
+    def generate_html_from_briefs(self, briefs: Dict, date_str: str, output_path: Path,
+                                  prepared: Optional[Dict] = None):
+        """从 AI briefs 生成 HTML (使用 Jinja2 模板)；prepared 为 _prepare_briefs_for_template 的结果，可复用"""
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        prepared = self._prepare_briefs_for_template(briefs)
+        if prepared is None:
+            prepared = self._prepare_briefs_for_template(briefs)
         non_empty_briefs = prepared['briefs']
 
         if not non_empty_briefs:
@@ -187,43 +326,22 @@ class ReportGenerator:
         # Use template if available
         if self.jinja_env:
             try:
-                template = self.jinja_env.get_template('report.html.j2')
-
-                total_items = sum(len(items) for items in non_empty_briefs.values())
-
-                # 直接传递 briefs（已包含 importance/tags/insight）
-                formatted_briefs = {}
-                for section, section_briefs in non_empty_briefs.items():
-                    formatted_briefs[section] = []
-                    for brief in section_briefs:
-                        entry = {
-                            'title': brief.get('headline', 'No title'),
-                            'url': brief.get('url', '#'),
-                            'source': brief.get('source', 'unknown'),
-                            'text': brief.get('detail', ''),
-                            'importance': brief.get('importance', 3),
-                            'category_tags': brief.get('category_tags', []),
-                            'insight': brief.get('insight', ''),
-                        }
-                        # papers section 额外字段
-                        if section == 'papers':
-                            entry['authors'] = brief.get('authors', '')
-                            entry['arxiv_id'] = brief.get('arxiv_id', '')
-                            entry['research_tags'] = brief.get('research_tags', [])
-                            entry['practicality_score'] = brief.get('practicality_score', 3)
-                        formatted_briefs[section].append(entry)
+                template = self._html_tmpl or self.jinja_env.get_template('report.html.j2')
+
+                total_items = sum(map(len, non_empty_briefs.values()))
 
+                # 直接传递 briefs（已包含 headline/detail/importance/tags/insight），模板按原字段名取值
                 html = template.render(
                     date_str=date_str,
                     total_items=total_items,
-                    briefs=formatted_briefs,
+                    briefs=non_empty_briefs,
                     executive_summary=prepared['executive_summary'],
                     stats=prepared['stats'],
                     section_configs=self.section_configs,
                     section_order=self._get_section_order()
                 )
 
-                with open(output_path, 'w', encoding='utf-8') as f:
+                with open(output_path, 'w', encoding='utf-8', buffering=_WRITE_BUFFER) as f:
                     f.write(html)
 
                 print(f"🌐 HTML 已生成 (使用模板 {self.template_name}): {output_path}")
@@ -234,12 +352,13 @@ class ReportGenerator:
         # Fallback
         self._generate_html_fallback(non_empty_briefs, date_str, output_path)
 
-    def _generate_empty_markdown(self, date_str: str, output_path: Path):
+    def _generate_empty_markdown(self, date_str: str, output_path: Path,
+                                 generated_time: Optional[str] = None):
         """Generate empty markdown report"""
-        lines = [
+        _write_lines(output_path, (
             f"# Daily Report - {date_str}",
             "",
-            f"*Generated by Newsloom AI at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*",
+            f"*Generated by Newsloom AI at: {generated_time or _now_str()}*",
             "",
             "---",
             "",
@@ -250,9 +369,7 @@ class ReportGenerator:
             "---",
             "",
             "*Generated by Newsloom 📰*"
-        ]
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
+        ))
 
     def _generate_empty_html(self, date_str: str, output_path: Path):
         """Generate empty HTML report"""
@@ -269,44 +386,51 @@ class ReportGenerator:
     <p>No items to report today.</p>
 </body>
 </html>"""
-        with open(output_path, 'w', encoding='utf-8') as f:
+        with open(output_path, 'w', encoding='utf-8', buffering=_WRITE_BUFFER) as f:
             f.write(simple_html)
 
     def _generate_markdown_fallback(self, briefs: Dict, date_str: str, output_path: Path,
-                                     executive_summary: str = ""):
+                                     executive_summary: str = "", generated_time: Optional[str] = None):
         """Fallback markdown generation without templates"""
-        lines = [
-            f"# Daily Report - {date_str}",
-            "",
-            f"*Generated by Newsloom AI at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*",
-            "",
-            "---",
-            ""
-        ]
+        _write_lines(output_path, self._iter_markdown_fallback(
+            briefs, date_str, executive_summary, generated_time or _now_str()
+        ))
+
+        print(f"📄 Markdown 已生成 (fallback): {output_path}")
+
+    def _iter_markdown_fallback(self, briefs: Dict, date_str: str, executive_summary: str,
+                                generated_time: str) -> Iterator[str]:
+        """Yield fallback markdown report lines (streamed to disk by _write_lines)"""
+        yield f"# Daily Report - {date_str}"
+        yield ""
+        yield f"*Generated by Newsloom AI at: {generated_time}*"
+        yield ""
+        yield "---"
+        yield ""
 
         # Executive Summary
         if executive_summary:
-            lines.append("## 📌 Executive Summary")
-            lines.append("")
-            lines.append(executive_summary)
-            lines.append("")
-            lines.append("---")
-            lines.append("")
+            yield "## 📌 Executive Summary"
+            yield ""
+            yield executive_summary
+            yield ""
+            yield "---"
+            yield ""
         else:
-            lines.extend(self._build_executive_summary(briefs))
+            yield from self._build_executive_summary(briefs)
 
         # Table of contents
-        lines.append("## Table of Contents")
-        lines.append("")
+        yield "## Table of Contents"
+        yield ""
         for section in self._get_section_order():
             if section in briefs:
                 section_meta = self.section_configs.get(section, {})
                 emoji = section_meta.get('emoji', '')
                 title = section_meta.get('title', section.replace('_', ' ').title())
-                lines.append(f"- [{emoji} {title}](#{section})")
-        lines.append("")
-        lines.append("---")
-        lines.append("")
+                yield f"- [{emoji} {title}](#{section})"
+        yield ""
+        yield "---"
+        yield ""
 
         # Content sections
         for section in self._get_section_order():
@@ -318,10 +442,10 @@ class ReportGenerator:
             emoji = section_meta.get('emoji', '')
             title = section_meta.get('title', section.replace('_', ' ').title())
 
-            lines.append(f"## {emoji} {title}")
-            lines.append("")
-            lines.append(f"*{len(section_briefs)} items*")
-            lines.append("")
+            yield f"## {emoji} {title}"
+            yield ""
+            yield f"*{len(section_briefs)} items*"
+            yield ""
 
             for i, brief in enumerate(section_briefs, 1):
                 headline = brief.get('headline', 'No headline')
@@ -335,8 +459,8 @@ class ReportGenerator:
                 # 重要性 emoji
                 stars = '⭐' * min(importance, 5)
 
-                lines.append(f"### {i}. [{headline}]({url})")
-                lines.append("")
+                yield f"### {i}. [{headline}]({url})"
+                yield ""
 
                 # papers section 显示额外学术信息
                 if section == 'papers':
@@ -349,45 +473,40 @@ class ReportGenerator:
                     if arxiv_id:
                         meta_parts.append(f"**arXiv:** `{arxiv_id}`")
                     meta_parts.append(stars)
-                    lines.append(" | ".join(meta_parts))
+                    yield " | ".join(meta_parts)
 
                     if authors:
-                        lines.append(f"**作者:** {authors}")
+                        yield f"**作者:** {authors}"
                     if research_tags:
-                        lines.append(f"**研究方向:** {' '.join(f'`{t}`' for t in research_tags)}")
-                    lines.append(f"**实用性:** {'🔧' * min(practicality, 5)} ({practicality}/5)")
+                        yield f"**研究方向:** {' '.join(f'`{t}`' for t in research_tags)}"
+                    yield f"**实用性:** {'🔧' * min(practicality, 5)} ({practicality}/5)"
                 else:
-                    lines.append(f"**来源:** {source} | {stars}")
+                    yield f"**来源:** {source} | {stars}"
 
                 if tags:
-                    lines.append(f"**标签:** {' '.join(f'`{t}`' for t in tags)}")
-                lines.append("")
+                    yield f"**标签:** {' '.join(f'`{t}`' for t in tags)}"
+                yield ""
                 if detail:
-                    lines.append(f"{detail}")
-                    lines.append("")
+                    yield f"{detail}"
+                    yield ""
                 if insight:
-                    lines.append(f"*{insight}*")
-                    lines.append("")
-                lines.append("---")
-                lines.append("")
+                    yield f"*{insight}*"
+                    yield ""
+                yield "---"
+                yield ""
 
         # Footer
-        lines.append("")
-        lines.append("---")
-        lines.append("")
-        lines.append("*Generated by Newsloom 📰*")
-
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
-
-        print(f"📄 Markdown 已生成 (fallback): {output_path}")
+        yield ""
+        yield "---"
+        yield ""
+        yield "*Generated by Newsloom 📰*"
 
     def _build_executive_summary(self, briefs: Dict) -> List[str]:
         """从每个 section 的 top brief 生成 Executive Summary（简单版）"""
         lines = []
         lines.append("## 📌 Executive Summary")
         lines.append("")
-        total = sum(len(v) for v in briefs.values())
+        total = sum(map(len, briefs.values()))
         lines.append(f"> 今日共 **{total}** 条精选，覆盖 {len(briefs)} 个板块。以下是各领域最值得关注的动态：")
         lines.append(">")
         for section in self._get_section_order():
@@ -406,7 +525,13 @@ class ReportGenerator:
 
     def _generate_html_fallback(self, briefs: Dict, date_str: str, output_path: Path):
         """Fallback HTML generation (simple version)"""
-        html = f"""<!DOCTYPE html>
+        _write_chunks(output_path, self._iter_html_fallback(briefs, date_str))
+
+        print(f"🌐 HTML 已生成 (fallback): {output_path}")
+
+    def _iter_html_fallback(self, briefs: Dict, date_str: str) -> Iterator[str]:
+        """Yield fallback HTML report fragments (streamed to disk by _write_chunks)"""
+        yield f"""<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
@@ -428,107 +553,92 @@ class ReportGenerator:
             if section not in briefs:
                 continue
             section_meta = self.section_configs.get(section, {})
-            title = section_meta.get('title', section)
+            title = _escape(section_meta.get('title', section))
             emoji = section_meta.get('emoji', '')
 
-            html += f'<div class="section"><h2>{emoji} {title}</h2>'
+            yield f'<div class="section"><h2>{emoji} {title}</h2>'
             for brief in briefs[section]:
-                headline = brief.get('headline', 'No title')
-                url = brief.get('url', '#')
-                detail = brief.get('detail', '')
-                html += f'<div class="card"><h3><a href="{url}">{headline}</a></h3><p>{detail}</p></div>'
-            html += '</div>'
+                headline = _escape(brief.get('headline', 'No title'))
+                url = _escape(brief.get('url', '#'))
+                detail = _escape(brief.get('detail', ''))
+                yield f'<div class="card"><h3><a href="{url}">{headline}</a></h3><p>{detail}</p></div>'
+            yield '</div>'
 
-        html += """
+        yield """
     </div>
 </body>
 </html>"""
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html)
-
-        print(f"🌐 HTML 已生成 (fallback): {output_path}")
-
     # ============================================================
     # 以下是原始 Item 格式的生成方法（向后兼容）
     # ============================================================
 
-    def generate_markdown(self, items: List, date_str: str, output_path: Path):
+    def generate_markdown(self, items: List, date_str: str, output_path: Path,
+                          generated_time: Optional[str] = None):
         """Generate Markdown report from raw Items (backward compatible)"""
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        by_channel = {}
-        for item in items:
-            channel = getattr(item, 'channel', 'general')
-            by_channel.setdefault(channel, []).append(item)
+        by_channel = _group_by_channel(items)
 
-        for channel in by_channel:
-            by_channel[channel].sort(key=lambda x: getattr(x, 'score', 0), reverse=True)
+        _write_lines(output_path, self._iter_markdown_items(by_channel, date_str, generated_time or _now_str()))
 
-        lines = [
-            f"# Daily Report - {date_str}",
-            "",
-            f"*Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*",
-            "",
-            "---",
-            ""
-        ]
+        print(f"📄 Generated Markdown: {output_path}")
+
+    def _iter_markdown_items(self, by_channel: Dict[str, List], date_str: str,
+                             generated_time: str) -> Iterator[str]:
+        """Yield raw-Item markdown report blocks (streamed to disk by _write_lines)"""
+        # 每次 yield 一整块（块内自带换行），_write_lines 再在块之间补一个换行
+        yield f"# Daily Report - {date_str}\n\n*Generated at: {generated_time}*\n\n---\n"
 
         for channel in sorted(by_channel.keys()):
             items_list = by_channel[channel]
             channel_name = channel.replace('_', ' ').title()
 
-            lines.append(f"## {channel_name}")
-            lines.append("")
+            yield f"## {channel_name}\n"
 
             for i, item in enumerate(items_list, 1):
-                title = getattr(item, 'title', 'No title')
-                url = getattr(item, 'url', '#')
-                meta = getattr(item, 'metadata', {}) or {}
-                source = meta.get('feed_name') or meta.get('feed_title') or getattr(item, 'source', 'unknown')
-
-                lines.append(f"### {i}. [{title}]({url})")
-                lines.append(f"**Source:** {source}")
-                lines.append("")
+                try:
+                    title, url, meta, source = _item_md_fields(item)
+                except AttributeError:
+                    title = getattr(item, 'title', 'No title')
+                    url = getattr(item, 'url', '#')
+                    meta = getattr(item, 'metadata', {})
+                    source = getattr(item, 'source', 'unknown')
+                meta = meta or {}
+                source = meta.get('feed_name') or meta.get('feed_title') or source
 
-            lines.append("---")
-            lines.append("")
+                yield f"### {i}. [{title}]({url})\n**Source:** {source}\n"
 
-        lines.append("*Generated by Newsloom 📰*")
+            yield "---\n"
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
-
-        print(f"📄 Generated Markdown: {output_path}")
+        yield "*Generated by Newsloom 📰*"
 
     def generate_html(self, items: List, date_str: str, output_path: Path):
         """Generate HTML report from raw Items (backward compatible)"""
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        by_channel = {}
-        for item in items:
-            channel = getattr(item, 'channel', 'general')
-            by_channel.setdefault(channel, []).append(item)
+        by_channel = _group_by_channel(items)
+
+        _write_chunks(output_path, self._iter_html_items(by_channel, date_str))
 
-        for channel in by_channel:
-            by_channel[channel].sort(key=lambda x: getattr(x, 'score', 0), reverse=True)
+        print(f"🌐 Generated HTML: {output_path}")
 
-        html = f"""<!DOCTYPE html>
+    def _iter_html_items(self, by_channel: Dict[str, List], date_str: str) -> Iterator[str]:
+        """Yield raw-Item HTML report fragments (streamed to disk by _write_chunks)"""
+        yield f"""<!DOCTYPE html>
 <html><head><meta charset="UTF-8"><title>Report - {date_str}</title></head>
 <body style="font-family:sans-serif;padding:40px;background:#f5f5f5;">
 <div style="max-width:1000px;margin:0 auto;">
 <h1>📊 Daily Report - {date_str}</h1>"""
 
         for channel in sorted(by_channel.keys()):
-            html += f'<h2>{channel}</h2>'
+            yield f'<h2>{_escape(channel)}</h2>'
             for item in by_channel[channel]:
-                title = getattr(item, 'title', '')
-                url = getattr(item, 'url', '#')
-                html += f'<div style="background:#fff;padding:16px;margin:8px 0;border-radius:8px;"><a href="{url}">{title}</a></div>'
-
-        html += '</div></body></html>'
-
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html)
-
-        print(f"🌐 Generated HTML: {output_path}")
+                try:
+                    title, url = _item_link(item)
+                except AttributeError:
+                    title, url = getattr(item, 'title', ''), getattr(item, 'url', '#')
+                title, url = _escape(title), _escape(url)
+                yield f'<div style="background:#fff;padding:16px;margin:8px 0;border-radius:8px;"><a href="{url}">{title}</a></div>'
+
+        yield '</div></body></html>'
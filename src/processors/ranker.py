@@ -9,6 +9,7 @@
 """
 
 import re
+import heapq
 import hashlib
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime, timezone, timedelta
@@ -147,11 +148,8 @@ class CoarseRanker:
             item.score = score
             scored.append((score, item))
 
-        # 按分数降序
-        scored.sort(key=lambda x: x[0], reverse=True)
-
-        result = [item for _, item in scored[:top_n]]
-        return result
+        # 按分数降序取 Top N
+        return [item for _, item in heapq.nlargest(top_n, scored, key=lambda x: x[0])]
 
     def _score_item(self, item: Item) -> float:
         """
@@ -326,12 +324,14 @@ class Deduplicator:
         return {w for w in words if w not in stop_words and len(w) > 1}
 
     def _jaccard(self, set_a: set, set_b: set) -> float:
-        """Jaccard 相似度"""
-        if not set_a or not set_b:
+        """Jaccard 相似度（上界 min/max 已低于阈值时不求交集，直接返回 0）"""
+        len_a, len_b = len(set_a), len(set_b)
+        if not len_a or not len_b:
+            return 0.0
+        if min(len_a, len_b) / max(len_a, len_b) < self.threshold:
             return 0.0
         intersection = len(set_a & set_b)
-        union = len(set_a | set_b)
-        return intersection / union if union > 0 else 0.0
+        return intersection / (len_a + len_b - intersection)
 
 
 class RankingPipeline:
@@ -48,6 +48,9 @@ class TrendDetector:
         # 2. 加载历史数据并提取关键词
         historical = self._load_historical(today_date)
         
+        # 检索文本每条 brief 只小写一次，所有关键词共用
+        search_index = self._build_search_index(today_briefs)
+
         if not historical:
             # 没有历史数据，全部标为 new
             return [
@@ -57,7 +60,7 @@ class TrendDetector:
                     "today_count": count,
                     "avg_count": 0,
                     "change_pct": 100,
-                    "related_headlines": self._find_headlines(kw, today_briefs)[:3]
+                    "related_headlines": self._find_headlines(kw, search_index)[:3]
                 }
                 for kw, count in today_keywords.most_common(15)
             ]
@@ -102,14 +105,18 @@ class TrendDetector:
                 "today_count": today_count,
                 "avg_count": round(avg_count, 1),
                 "change_pct": round(change_pct, 1),
-                "related_headlines": self._find_headlines(kw, today_briefs)[:3]
             })
         
         # 按变化幅度排序，rising 优先
         trend_priority = {"🔥 rising": 0, "🆕 new": 1, "📈 steady": 2, "📉 declining": 3}
         trends.sort(key=lambda x: (trend_priority.get(x["trend"], 9), -abs(x["change_pct"])))
-        
-        return trends[:20]  # Top 20
+        trends = trends[:20]  # Top 20
+
+        # 只为入选的趋势查找相关 headlines
+        for trend in trends:
+            trend["related_headlines"] = self._find_headlines(trend["keyword"], search_index)[:3]
+
+        return trends
     
     def save_today_keywords(self, briefs: Dict[str, List[Dict]], date: str = None):
         """保存今日关键词到历史数据（供未来对比）"""
@@ -194,17 +201,24 @@ class TrendDetector:
         
         return historical
     
-    def _find_headlines(self, keyword: str, briefs: Dict[str, List[Dict]]) -> List[str]:
-        """找到包含关键词的 headlines"""
-        headlines = []
-        kw_lower = keyword.lower()
-        
+    @staticmethod
+    def _build_search_index(briefs: Dict[str, List[Dict]]) -> List[Tuple[str, str, str]]:
+        """预计算 (headline, 小写 headline, 小写 tags) 供 _find_headlines 复用"""
+        index = []
         for section, items in briefs.items():
             if section.startswith('__') or not isinstance(items, list):
                 continue
             for item in items:
                 headline = item.get('headline', '')
-                if kw_lower in headline.lower() or kw_lower in ' '.join(item.get('category_tags', [])).lower():
-                    headlines.append(headline)
-        
-        return headlines
\ No newline at end of file
+                tags = ' '.join(item.get('category_tags', []))
+                index.append((headline, headline.lower(), tags.lower()))
+        return index
+
+    def _find_headlines(self, keyword: str, search_index: List[Tuple[str, str, str]]) -> List[str]:
+        """找到包含关键词的 headlines"""
+        kw_lower = keyword.lower()
+        return [
+            headline
+            for headline, headline_lower, tags_lower in search_index
+            if kw_lower in headline_lower or kw_lower in tags_lower
+        ]
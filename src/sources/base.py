@@ -2,9 +2,13 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field, asdict
+from concurrent.futures import Executor
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone
+import asyncio
+import functools
 import hashlib
+from urllib.parse import urlparse
 
 
 @dataclass
@@ -32,6 +36,19 @@ class Item:
     score: float = 0.0         # Filter score
     filtered: bool = False      # Whether passed filtering
 
+    @functools.cached_property
+    def domain(self) -> str:
+        """URL host without 'www.' ('' if the URL can't be parsed); computed once per item"""
+        try:
+            return urlparse(self.url).netloc.replace('www.', '')
+        except (ValueError, TypeError):
+            return ''
+
+    @functools.cached_property
+    def search_text(self) -> str:
+        """Lowercased "title text", shared by the filter stages; computed once per item"""
+        return f"{self.title} {self.text}".lower()
+
     def to_dict(self) -> dict:
         """Serialize to dictionary (for JSONL storage)"""
         data = asdict(self)
@@ -76,6 +93,17 @@ class DataSource(ABC):
         """
         pass
 
+    async def fetch_async(self, hours_ago: Optional[int] = None,
+                          executor: Optional[Executor] = None) -> List[Item]:
+        """
+        Async variant of fetch, used by ParallelFetcher
+
+        The default runs the blocking fetch() in `executor`; sources with many
+        small HTTP requests can override this with a native async client.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(self.fetch, hours_ago=hours_ago))
+
     @abstractmethod
     def get_source_name(self) -> str:
         """Return unique data source identifier"""
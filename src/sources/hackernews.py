@@ -1,5 +1,7 @@
 """Hacker News 数据源"""
 
+import asyncio
+import re
 import httpx
 from typing import List, Optional
 from datetime import datetime, timezone
@@ -73,14 +75,60 @@ class HackerNewsSource(DataSource):
             print(f"    ⚠️  Hacker News 抓取失败: {e}")
             return []
 
+    async def fetch_async(self, hours_ago: Optional[int] = None, executor=None) -> List[Item]:
+        """抓取 Hacker News 热门故事（单个 AsyncClient 复用连接，协程并发）"""
+        min_score = self.config.get('min_score', 100)
+        count = self.config.get('count', 20)
+        max_workers = self.config.get('max_workers', 10)
+
+        print(f"    📰 抓取 Hacker News: min_score={min_score}, count={count}, workers={max_workers}")
+
+        try:
+            async with httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=max_workers, max_keepalive_connections=max_workers)
+            ) as client:
+                # 获取 top stories ID
+                response = await client.get(f"{self.API_BASE}/topstories.json", timeout=30)
+                response.raise_for_status()
+                story_ids = response.json()[:count * 3]  # 多取一些以防过滤
+
+                async def fetch_story(story_id: int) -> Optional[Item]:
+                    try:
+                        resp = await client.get(f"{self.API_BASE}/item/{story_id}.json", timeout=10)
+                        resp.raise_for_status()
+                        return self._story_from_data(story_id, resp.json())
+                    except Exception as e:
+                        print(f"    ⚠️  获取 HN 故事 {story_id} 失败: {e}")
+                        return None
+
+                stories = await asyncio.gather(*(fetch_story(story_id) for story_id in story_ids))
+
+            items = [
+                story for story in stories
+                if story and story.metadata.get('score', 0) >= min_score
+            ]
+
+            # 按分数排序并限制数量
+            items.sort(key=lambda x: x.metadata.get('score', 0), reverse=True)
+            items = items[:count]
+
+            print(f"    ✅ Hacker News: 获取到 {len(items)} 条故事")
+            return items
+
+        except Exception as e:
+            print(f"    ⚠️  Hacker News 抓取失败: {e}")
+            return []
+
     def _fetch_story(self, story_id: int) -> Optional[Item]:
         """获取单个故事详情"""
         url = f"{self.API_BASE}/item/{story_id}.json"
         response = httpx.get(url, timeout=10)
         response.raise_for_status()
 
-        data = response.json()
+        return self._story_from_data(story_id, response.json())
 
+    def _story_from_data(self, story_id: int, data: Optional[dict]) -> Optional[Item]:
+        """把 HN item JSON 转成 Item（非 story 返回 None）"""
         if not data or data.get('type') != 'story':
             return None
 
@@ -99,7 +147,6 @@ class HackerNewsSource(DataSource):
         text_content = data.get('text', '')
         if text_content:
             # 简单清理 HTML
-            import re
             text_content = re.sub(r'<[^>]+>', '', text_content)
 
         # 构建描述
@@ -0,0 +1,63 @@
+"""Persistent cache of AI-generated briefs across pipeline runs"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from .json_utils import dumps, loads
+
+
+def item_fingerprint(item) -> str:
+    """Content hash of the fields the extract prompt sees"""
+    content = f"{item.url}\x00{item.title}\x00{item.text[:800]}"
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class BriefCache:
+    """
+    SQLite-backed brief cache
+
+    Keys combine the item fingerprint with section, language, model and
+    prompt version, so changing any of them naturally misses the cache.
+    Safe to share between analyzer worker threads.
+    """
+
+    def __init__(self, db_path: Path, max_age_days: int = 30):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS briefs ("
+                "key TEXT PRIMARY KEY, brief BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "DELETE FROM briefs WHERE created_at < ?",
+                (time.time() - max_age_days * 86400,),
+            )
+
+    @staticmethod
+    def make_key(item, section: str, language: str, model: str, prompt_version) -> str:
+        return f"{item_fingerprint(item)}|{section}|{language}|{model}|{prompt_version}"
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT brief FROM briefs WHERE key = ?", (key,)
+            ).fetchone()
+        return loads(row[0]) if row else None
+
+    def set(self, key: str, brief: dict):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO briefs (key, brief, created_at) VALUES (?, ?, ?)",
+                (key, dumps(brief), time.time()),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
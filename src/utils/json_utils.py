@@ -0,0 +1,47 @@
+"""JSON helpers with optional orjson acceleration"""
+
+import json
+from pathlib import Path
+from typing import Any, List
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes (non-ASCII kept as-is)"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+
+def loads(data) -> Any:
+    """Parse JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_json(path: Path, obj: Any, indent: bool = True):
+    """Serialize and write a JSON file in a single write call"""
+    Path(path).write_bytes(dumps(obj, indent=indent))
+
+
+def read_json(path: Path) -> Any:
+    """Read a JSON file in one read call"""
+    return loads(Path(path).read_bytes())
+
+
+def write_jsonl(path: Path, objs) -> None:
+    """Serialize one object per line and write the file in a single write call"""
+    Path(path).write_bytes(b''.join(dumps(obj) + b'\n' for obj in objs))
+
+
+def read_jsonl(path: Path) -> List[Any]:
+    """Read a JSONL file in one read call and parse every non-blank line"""
+    return [loads(line) for line in Path(path).read_bytes().splitlines() if line.strip()]
@@ -0,0 +1,62 @@
+"""Persistent cache of parsed Claude JSON responses, keyed by prompt hash"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from .json_utils import dumps, loads
+
+
+class ResponseCache:
+    """
+    SQLite-backed response cache
+
+    Keys hash everything that determines the answer (model, system, prompt,
+    max_tokens, temperature, schema version), so re-running the same day's
+    analysis after a crash or for debugging costs no API calls.
+    Safe to share between analyzer worker threads.
+    """
+
+    def __init__(self, db_path: Path, max_age_days: int = 7):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?",
+                (time.time() - max_age_days * 86400,),
+            )
+
+    @staticmethod
+    def make_key(model: str, system: str, prompt: str, max_tokens: int,
+                 temperature: float, schema_version) -> str:
+        content = "\x00".join([
+            model, system, prompt, str(max_tokens), f"{temperature:.2f}", str(schema_version),
+        ])
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return loads(row[0]) if row else None
+
+    def set(self, key: str, response: Any):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at) VALUES (?, ?, ?)",
+                (key, dumps(response), time.time()),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -3,7 +3,7 @@
 import json
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
-from typing import Set, Optional
+from typing import Set, Optional, Iterable, List
 
 
 class StateManager:
@@ -52,6 +52,20 @@ class StateManager:
             timestamp = datetime.now(timezone.utc)
         self.state['item_timestamps'][item_id] = timestamp.isoformat()
 
+    def is_seen_batch(self, item_ids: Iterable[str]) -> List[bool]:
+        """Check many item ids against the seen set at once"""
+        seen = self.state['seen_items']
+        return [item_id in seen for item_id in item_ids]
+
+    def mark_seen_batch(self, item_ids: Iterable[str], timestamp: Optional[datetime] = None):
+        """Mark many items as seen with a single shared timestamp"""
+        item_ids = list(item_ids)
+        self.state['seen_items'].update(item_ids)
+
+        if timestamp is None:
+            timestamp = datetime.now(timezone.utc)
+        self.state['item_timestamps'].update(dict.fromkeys(item_ids, timestamp.isoformat()))
+
     def save(self, auto_cleanup: bool = True):
         """Persist state to file with automatic cleanup"""
         # Create parent directory if needed
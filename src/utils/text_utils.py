@@ -1,7 +1,10 @@
 """Text processing utilities"""
 
 import re
+import hashlib
+from collections import Counter
 from typing import Optional
+from urllib.parse import urlsplit, urlunsplit
 
 
 def clean_text(text: str) -> str:
@@ -80,3 +83,66 @@ def calculate_keyword_score(text: str, keywords: dict) -> float:
     matches = extract_keywords(text, keywords)
     score = sum(keywords[kw] * count for kw, count in matches.items())
     return score
+
+
+_WORD_RE = re.compile(r'\w+')
+
+
+# Query params that only track the click, never identify the content
+_TRACKING_PARAMS = frozenset({
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'igshid', 'mc_cid', 'mc_eid', 'ref_src', 'spm',
+})
+
+
+def _is_tracking_param(param: str) -> bool:
+    name = param.split('=', 1)[0].lower()
+    return name.startswith('utm_') or name in _TRACKING_PARAMS
+
+
+def canonical_url(url: str) -> str:
+    """
+    Canonical URL for duplicate detection
+
+    Lowercases scheme/host, drops 'www.', the fragment, the trailing slash and
+    tracking params (utm_* etc.). The rest of the query is kept: it often
+    identifies the content (news.ycombinator.com/item?id=N, youtube.com/watch?v=...).
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    netloc = parts.netloc.lower()
+    if netloc.startswith('www.'):
+        netloc = netloc[4:]
+    query = '&'.join(
+        param for param in parts.query.split('&')
+        if param and not _is_tracking_param(param)
+    )
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path.rstrip('/'), query, ''))
+
+
+def simhash64(text: str) -> int:
+    """
+    64-bit SimHash over lowercase word tokens (weighted by term frequency)
+
+    Near-duplicate texts produce fingerprints with a small Hamming distance.
+    """
+    weights = [0] * 64
+    for token, count in Counter(_WORD_RE.findall(text.lower())).items():
+        h = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            if h >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints"""
+    return (a ^ b).bit_count()
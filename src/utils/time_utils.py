@@ -4,6 +4,11 @@ from datetime import datetime, timezone, timedelta
 from typing import Optional
 
 
+class PipelineTimeout(Exception):
+    """Pipeline global timeout exceeded (raised from the SIGALRM handler)"""
+    pass
+
+
 def parse_time_ago(hours: int) -> datetime:
     """Get datetime N hours ago (UTC)"""
     return datetime.now(timezone.utc) - timedelta(hours=hours)
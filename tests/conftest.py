@@ -0,0 +1,6 @@
+"""pytest 配置：和 run.py / run_v2.py 一样把 src 加到导入路径"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
@@ -0,0 +1,64 @@
+"""ai.claude._JSONArraySplitter：流式切分 JSON 数组元素"""
+
+import json
+
+import pytest
+
+from ai.claude import ClaudeClient, _JSONArraySplitter
+
+
+def _split(text: str, chunk_size: int) -> list:
+    splitter = _JSONArraySplitter()
+    elements = []
+    for start in range(0, len(text), chunk_size):
+        elements.extend(splitter.feed(text[start:start + chunk_size]))
+    assert splitter.text == text
+    return elements
+
+
+BRIEFS = [
+    {"headline": "a [bracket] {brace}", "url": "https://x/1", "tags": ["ai", "llm"]},
+    {"headline": 'quote \\" and escape \\\\', "detail": "多字节 ✓", "nested": {"k": [1, {"v": "]"}]}},
+    [1, 2, {"three": 3}],
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 10_000])
+@pytest.mark.parametrize("text", [
+    json.dumps(BRIEFS),
+    json.dumps(BRIEFS, indent=2, ensure_ascii=False),
+    "```json\n" + json.dumps(BRIEFS) + "\n```",
+    "\n  ```\n" + json.dumps(BRIEFS, ensure_ascii=False) + "\n```\n",
+])
+def test_splits_top_level_array(text, chunk_size):
+    assert _split(text, chunk_size) == json.loads(json.dumps(BRIEFS))
+
+
+@pytest.mark.parametrize("text", [
+    # 外层对象里更早出现的数组字段不能被当成结果数组
+    '{"tags": ["x", "y"], "items": [{"a": 1}]}',
+    # 前面有说明文字时交给整段解析
+    'Here are the results:\n[{"a": 1}]',
+    '``[{"a": 1}]',
+])
+def test_non_array_top_level_is_not_split(text):
+    for chunk_size in (1, 5, len(text)):
+        assert _split(text, chunk_size) == []
+
+
+def test_wrapper_object_falls_back_to_items():
+    text = '{"tags": ["x", "y"], "items": [{"a": 1}, {"b": 2}]}'
+    assert _split(text, 4) == []
+    assert ClaudeClient.json_elements(json.loads(text)) == [{"a": 1}, {"b": 2}]
+
+
+def test_scalars_are_skipped_and_stops_at_array_end():
+    assert _split('[1, "s", {"a": 1}, null] [{"b": 2}]', 3) == [{"a": 1}]
+
+
+def test_malformed_element_is_skipped():
+    assert _split('[{"a": 1,}, {"b": 2}]', 2) == [{"b": 2}]
+
+
+def test_incomplete_stream_yields_closed_elements_only():
+    assert _split('[{"a": 1}, {"b": ', 3) == [{"a": 1}]
@@ -0,0 +1,140 @@
+"""processors.filter：去重 / 相关性打分与朴素实现逐项一致"""
+
+import random
+import re
+from datetime import datetime, timezone
+
+import pytest
+
+from processors import filter as filter_module
+from processors.filter import DedupEngine, RelevanceScorer, OWNER_INTEREST_KEYWORDS
+from sources.base import Item
+
+
+WORDS = (
+    "openai releases new model gpt agent bitcoin price surges etf approval nvidia gpu "
+    "chip ban china rust python release defi hack exploit million llm fine-tuning "
+    "open source quant trading strategy backtest eth said method"
+).split()
+CJK_WORDS = ["大模型", "量化", "量化交易", "比特币", "回测", "发布", "新闻", "策略"]
+
+
+def _item(i: int, title: str, text: str = "", score: float = 0.0) -> Item:
+    return Item(
+        id=f"t:{i}", source="t", channel="ai", title=title, text=text, url=f"https://x/{i}",
+        author="a", published_at=datetime.now(timezone.utc), score=score,
+    )
+
+
+def _random_title(rng: random.Random, pool: list) -> str:
+    words = rng.sample(WORDS + CJK_WORDS, rng.randint(1, 8))
+    if pool and rng.random() < 0.4:
+        # 在已有标题上小改，制造近似重复
+        words = rng.choice(pool).split()
+        words[rng.randrange(len(words))] = rng.choice(WORDS + CJK_WORDS)
+    return " ".join(words) + rng.choice(["", "!", " 2", "：更新"])
+
+
+def _random_corpus(seed: int, size: int) -> list:
+    rng = random.Random(seed)
+    titles = []
+    for _ in range(size):
+        titles.append(_random_title(rng, titles))
+    return [_item(i, title, score=rng.randint(0, 5)) for i, title in enumerate(titles)]
+
+
+def _pairwise_dedup(engine: DedupEngine, items: list) -> list:
+    """参照实现：逐条与已保留条目直接算 Jaccard"""
+    kept = []  # [(item, tokens)]
+    for item in items:
+        tokens = engine._tokenize(item.title)
+        for j, (kept_item, kept_tokens) in enumerate(kept):
+            union = len(tokens | kept_tokens)
+            sim = len(tokens & kept_tokens) / union if tokens and kept_tokens else 0.0
+            if sim >= engine.threshold:
+                if item.score > kept_item.score:
+                    kept[j] = (item, tokens)
+                break
+        else:
+            kept.append((item, tokens))
+    return [item for item, _ in kept]
+
+
+@pytest.mark.parametrize("threshold", [0.0, 0.3, 0.5, 0.7, 1.0])
+@pytest.mark.parametrize("seed", range(12))
+def test_dedup_matches_pairwise_scan(seed, threshold):
+    items = _random_corpus(seed, 150)
+    engine = DedupEngine(threshold=threshold)
+    assert [item.id for item in engine.deduplicate(items)] == \
+        [item.id for item in _pairwise_dedup(engine, items)]
+
+
+def test_dedup_keeps_higher_score():
+    items = [_item(0, "OpenAI releases GPT-5", score=1), _item(1, "openai releases gpt-5!", score=3)]
+    assert [item.id for item in DedupEngine(threshold=0.5).deduplicate(items)] == ["t:1"]
+
+
+def test_dedup_empty():
+    assert DedupEngine().deduplicate([]) == []
+
+
+def _naive_score(scorer: RelevanceScorer, item: Item) -> float:
+    """参照实现：逐个关键词扫描（短语 / 中文子串计数，单词按 \\b 边界）"""
+    text = f"{item.title} {item.title} {item.text}".lower()
+    length_norm = scorer._c1 + scorer._c2 * (text.count(" ") + 1)
+    total = 0.0
+    for keyword, weight in scorer.keywords.items():
+        keyword = keyword.lower()
+        if " " in keyword or re.search(r"[\u4e00-\u9fff]", keyword):
+            tf = text.count(keyword)
+        else:
+            tf = len(re.findall(r"\b" + re.escape(keyword) + r"\b", text))
+        if tf:
+            total += weight * ((tf * scorer._k1p1) / (tf + length_norm))
+    return total
+
+
+def _random_scoring_corpus(seed: int, size: int) -> list:
+    rng = random.Random(seed)
+    vocab = WORDS + CJK_WORDS + list(OWNER_INTEREST_KEYWORDS) + ["GPT", "Bitcoin", "ΣΑΣ", "İstanbul"]
+    items = []
+    for i in range(size):
+        title = " ".join(rng.choices(vocab, k=rng.randint(1, 6)))
+        # 正文里混入无空格拼接的中文，覆盖 \b 在汉字之间不成立的情况
+        text = rng.choice([" ", "", "-", "，"]).join(rng.choices(vocab, k=rng.randint(0, 40)))
+        items.append(_item(i, title, text))
+    return items
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_relevance_score_matches_naive_scan(seed):
+    scorer = RelevanceScorer()
+    for item in _random_scoring_corpus(seed, 200):
+        assert scorer.score(item) == _naive_score(scorer, item)
+
+
+@pytest.mark.skipif(filter_module.ahocorasick is None, reason="pyahocorasick not installed")
+@pytest.mark.parametrize("seed", range(3))
+def test_phrase_automaton_matches_fallback(seed):
+    with_automaton = RelevanceScorer()
+    fallback = RelevanceScorer()
+    fallback._phrase_automaton = None
+    for item in _random_scoring_corpus(seed, 200):
+        assert with_automaton.score(item) == fallback.score(item)
+
+
+def test_score_batch_matches_score():
+    scorer = RelevanceScorer()
+    items = _random_scoring_corpus(7, 50)
+    assert scorer.score_batch(items) == [scorer.score(item) for item in items]
+
+
+def test_cjk_keyword_matches_inside_text():
+    scorer = RelevanceScorer({"量化": 8})
+    assert scorer.score(_item(0, "比特币量化交易")) > 0
+
+
+def test_search_text_is_lowercased_title_and_text():
+    item = _item(0, "GPT-5 Released", "ΣΑΣ İstanbul")
+    assert item.search_text == "gpt-5 released σας i̇stanbul"
+    assert "search_text" not in item.to_dict()
@@ -0,0 +1,68 @@
+"""utils.text_utils：URL 规范化与 SimHash"""
+
+import random
+
+import pytest
+
+from utils.text_utils import canonical_url, hamming_distance, simhash64
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://WWW.Example.com/a/b/", "https://example.com/a/b"),
+    ("HTTPS://example.com/a#section", "https://example.com/a"),
+    ("https://example.com/a?utm_source=x&utm_medium=y", "https://example.com/a"),
+    ("https://example.com/a?fbclid=1&q=2&gclid=3", "https://example.com/a?q=2"),
+    ("https://www.youtube.com/watch?v=abc&utm_campaign=z#t=10", "https://youtube.com/watch?v=abc"),
+    ("  https://example.com/a  ", "https://example.com/a"),
+    ("", ""),
+])
+def test_canonical_url(url, expected):
+    assert canonical_url(url) == expected
+
+
+def test_canonical_url_keeps_identifying_query():
+    # HN 自发帖 / YouTube 视频只靠 query 区分，不能合并成同一个 key
+    assert canonical_url("https://news.ycombinator.com/item?id=1") != \
+        canonical_url("https://news.ycombinator.com/item?id=2")
+    assert canonical_url("https://youtube.com/watch?v=a") != canonical_url("https://youtube.com/watch?v=b")
+
+
+def test_canonical_url_same_content_same_key():
+    assert canonical_url("https://www.example.com/post/?utm_source=tw#comments") == \
+        canonical_url("https://example.com/post")
+
+
+def test_canonical_url_invalid():
+    # urlsplit 拒绝的 URL 原样返回（去掉首尾空白）
+    assert canonical_url(" http://[::1 ") == "http://[::1"
+
+
+def test_simhash_deterministic_and_case_insensitive():
+    text = "OpenAI releases a new reasoning model with better benchmarks"
+    assert simhash64(text) == simhash64(text.upper())
+    assert 0 <= simhash64(text) < 1 << 64
+
+
+def test_simhash_near_duplicates_are_close():
+    rng = random.Random(0)
+    words = [f"w{rng.randrange(10000)}" for _ in range(200)]
+    base = " ".join(words)
+    edited = " ".join(words[:-1] + ["changed"])
+    other = " ".join(f"x{rng.randrange(10000)}" for _ in range(200))
+    near = hamming_distance(simhash64(base), simhash64(edited))
+    far = hamming_distance(simhash64(base), simhash64(other))
+    assert near < 8 < far
+
+
+def test_simhash_ignores_word_order():
+    assert simhash64("bitcoin etf approval surges") == simhash64("surges approval etf bitcoin")
+
+
+def test_simhash_empty_text():
+    assert simhash64("") == 0
+
+
+def test_hamming_distance():
+    assert hamming_distance(0, 0) == 0
+    assert hamming_distance(0b1011, 0b0001) == 2
+    assert hamming_distance(0, (1 << 64) - 1) == 64